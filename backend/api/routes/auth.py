@@ -70,7 +70,7 @@ async def register(
         logger.info(f"Registration attempt for username: {user.username}, email: {user.email}")
         
         # Register user
-        created_user = auth_service.register_user(
+        created_user = await auth_service.register_user(
             user.email,
             user.username,
             user.password,
@@ -118,7 +118,7 @@ async def login(
         logger.info(f"Login attempt (OAuth2) for username: {form_data.username}")
         
         # Authenticate user
-        user = auth_service.authenticate_user(
+        user = await auth_service.authenticate_user(
             form_data.username,
             form_data.password,
             ip_address=request.client.host
@@ -189,7 +189,7 @@ async def client_login(
         logger.info(f"Login attempt (client) for username: {login_data.username}")
         
         # Authenticate user
-        user = auth_service.authenticate_user(
+        user = await auth_service.authenticate_user(
             login_data.username,
             login_data.password,
             ip_address=request.client.host
@@ -347,7 +347,7 @@ async def request_password_reset(
         logger.info(f"Password reset requested for email: {request_data.email}")
         
         # Create password reset token
-        token = auth_service.create_password_reset_token(request_data.email)
+        token = await auth_service.create_password_reset_token(request_data.email)
         
         # In a real application, send this token via email
         # For now, just return it (not secure for production)
@@ -395,7 +395,7 @@ async def confirm_password_reset(
         logger.info("Password reset confirmation attempt")
         
         # Reset password
-        auth_service.reset_password(reset_data.token, reset_data.password)
+        await auth_service.reset_password(reset_data.token, reset_data.password)
         
         logger.info("Password reset successful")
         
@@ -436,7 +436,7 @@ async def change_password(
         logger.info(f"Password change attempt for user: {current_user.get('username', user_id)}")
         
         # Change password
-        auth_service.change_password(
+        await auth_service.change_password(
             user_id,
             password_data.current_password,
             password_data.new_password
@@ -37,6 +37,8 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
     ALLOWED_HOSTS: List[str] = ["*"]
     CORS_ORIGINS: List[str] = ["*"]
+    TRUST_PROXY: bool = Field(False, env="TRUST_PROXY")  # Use X-Forwarded-For for client IP
+    TRUSTED_PROXY_HOPS: int = Field(1, env="TRUSTED_PROXY_HOPS")  # Proxies appending to X-Forwarded-For
     
     # Added missing API settings
     API_HOST: str = Field("localhost", env="API_HOST")
@@ -71,6 +73,8 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = Field(7, env="JWT_REFRESH_TOKEN_EXPIRE_DAYS")
     PASSWORD_RESET_EXPIRE_MINUTES: int = Field(15, env="PASSWORD_RESET_EXPIRE_MINUTES")
+    # How long a successful password check is remembered; 0 always runs bcrypt
+    PASSWORD_VERIFY_CACHE_TTL: int = Field(30, env="PASSWORD_VERIFY_CACHE_TTL")  # seconds
     
     # Added JWT Secret
     JWT_SECRET: str = Field("your-secure-jwt-secret-key-change-this-in-production", env="JWT_SECRET")
@@ -88,10 +92,23 @@ class Settings(BaseSettings):
     # Document processing settings
     CHUNK_SIZE: int = Field(1000, env="CHUNK_SIZE")
     CHUNK_OVERLAP: int = Field(200, env="CHUNK_OVERLAP")
+    EMBED_BATCH_SIZE: int = Field(256, env="EMBED_BATCH_SIZE")
+    INGEST_BATCH_SIZE: int = Field(256, env="INGEST_BATCH_SIZE")
+    INGEST_CONCURRENCY: int = Field(8, env="INGEST_CONCURRENCY")
+    # Extracted PDF text keyed by content digest; empty disables the cache
+    PDF_TEXT_CACHE_DIR: str = Field(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "pdf_text_cache"), env="PDF_TEXT_CACHE_DIR")
+    # Least recently used cache entries are deleted beyond this total size
+    PDF_TEXT_CACHE_MAX_BYTES: int = Field(512 * 1024 * 1024, env="PDF_TEXT_CACHE_MAX_BYTES")
     
     # RAG settings
     MAX_CHUNKS_PER_QUERY: int = Field(5, env="MAX_CHUNKS_PER_QUERY")
     SIMILARITY_THRESHOLD: float = Field(0.7, env="SIMILARITY_THRESHOLD")
+    CHROMA_MAX_CONCURRENCY: int = Field(8, env="CHROMA_MAX_CONCURRENCY")  # concurrent Chroma calls
+    # Cross-encoder reranking (needs fastembed); heuristic scoring otherwise
+    RERANKER_ENABLED: bool = Field(False, env="RERANKER_ENABLED")
+    RERANKER_MODEL_NAME: str = Field("BAAI/bge-reranker-base", env="RERANKER_MODEL_NAME")
+    # BM25 keyword fallback (needs bm25s); holds an index per collection in memory
+    BM25_ENABLED: bool = Field(False, env="BM25_ENABLED")
     
     # External API keys
     OPENAI_API_KEY: Optional[str] = Field(None, env="OPENAI_API_KEY")
@@ -129,8 +146,19 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
     
     # Analytics
+    ANALYTICS_ENABLED: bool = Field(True, env="ANALYTICS_ENABLED")
+    # Fraction of events recorded; below 1.0 event counts are sampled
+    ANALYTICS_SAMPLE_RATE: float = Field(1.0, env="ANALYTICS_SAMPLE_RATE")
     ANALYTICS_BUFFER_SIZE: int = Field(100, env="ANALYTICS_BUFFER_SIZE")
+    # Records held per buffer while writes fail; the oldest are dropped beyond this
+    ANALYTICS_BUFFER_MAX_RECORDS: int = Field(10000, env="ANALYTICS_BUFFER_MAX_RECORDS")
     ANALYTICS_FLUSH_INTERVAL: int = Field(60, env="ANALYTICS_FLUSH_INTERVAL")  # seconds
+    # Acknowledged, validated event writes; off trades durability for throughput
+    ANALYTICS_DURABLE: bool = Field(False, env="ANALYTICS_DURABLE")
+    ANALYTICS_ROLLUP_INTERVAL: int = Field(300, env="ANALYTICS_ROLLUP_INTERVAL")  # seconds
+    ANALYTICS_ROLLUP_BACKFILL_DAYS: int = Field(30, env="ANALYTICS_ROLLUP_BACKFILL_DAYS")
+    # Raw events and performance metrics older than this are deleted; 0 keeps them
+    ANALYTICS_RETENTION_DAYS: int = Field(0, env="ANALYTICS_RETENTION_DAYS")
     
     # Frontend settings
     THEME_COLOR: str = Field("#2563EB", env="THEME_COLOR")  # Blue
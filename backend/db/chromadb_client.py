@@ -1,6 +1,6 @@
 import os
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 import chromadb
 from chromadb.config import Settings
@@ -14,6 +14,9 @@ logger = setup_logger("chromadb_client")
 # Global client instance
 _client = None
 
+# Collection handles keyed by (name, embedding model id)
+_collection_cache: Dict[Tuple[str, Optional[int]], Any] = {}
+
 def get_chroma_client(
     persist_directory: Optional[str] = None,
     host: Optional[str] = None,
@@ -76,6 +79,7 @@ def reset_client() -> None:
     """Reset the global client instance"""
     global _client
     _client = None
+    _collection_cache.clear()
 
 def list_collections() -> list:
     """
@@ -146,6 +150,48 @@ def get_collection(
         logger.error(f"Error getting collection {name}: {str(e)}")
         return None
 
+def get_cached_collection(
+    name: str,
+    embedding_function: Optional[Any] = None
+) -> chromadb.Collection:
+    """
+    Get a collection by name, reusing the handle from earlier calls
+    
+    Args:
+        name: Collection name
+        embedding_function: Optional embedding function
+        
+    Returns:
+        Collection
+    """
+    # Bound methods are created per access, so key on the model behind them
+    owner = getattr(embedding_function, "__self__", embedding_function)
+    key = (name, id(owner) if owner is not None else None)
+    
+    collection = _collection_cache.get(key)
+    if collection is None:
+        collection = get_chroma_client().get_collection(
+            name=name,
+            embedding_function=embedding_function
+        )
+        _collection_cache[key] = collection
+    
+    return collection
+
+def invalidate_collection(name: Optional[str] = None) -> None:
+    """
+    Drop cached collection handles
+    
+    Args:
+        name: Collection name, or None to drop all handles
+    """
+    if name is None:
+        _collection_cache.clear()
+        return
+    
+    for key in [key for key in _collection_cache if key[0] == name]:
+        _collection_cache.pop(key, None)
+
 def get_or_create_collection(
     name: str, 
     embedding_function: Optional[Any] = None,
@@ -192,6 +238,7 @@ def delete_collection(name: str) -> bool:
     
     try:
         logger.info(f"Deleting collection: {name}")
+        invalidate_collection(name)
         client.delete_collection(name)
         return True
     except Exception as e:
@@ -140,6 +140,17 @@ def create_indices() -> None:
         db.documents.create_index("file_path", unique=True)
         db.documents.create_index("status")
         db.documents.create_index("ingestion_time")
+        # Covers the ingestion "already indexed?" lookups
+        db.documents.create_index([
+            ("file_path", pymongo.ASCENDING),
+            ("status", pymongo.ASCENDING),
+            ("document_id", pymongo.ASCENDING),
+            ("file_mtime", pymongo.ASCENDING)
+        ])
+        
+        # Chunk hashes collection
+        db.chunk_hashes.create_index("hash", unique=True)
+        db.chunk_hashes.create_index("chunk_id")
         
         # Analytics collection
         db.analytics.create_index("timestamp")
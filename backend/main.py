@@ -1,23 +1,35 @@
 import os
 import time
+import asyncio
 import threading
+from pathlib import Path
 from typing import Dict, Any
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.api.routes import api_router
 from backend.utils.session import ensure_safe_indices
 # Update the import to use RequestLogMiddleware directly
 from backend.utils.logging import setup_logger, RequestLogMiddleware
-from backend.db.mongodb import create_indices
+from backend.db.mongodb import create_indices, close_connections
 from backend.config import settings
 
 # Setup logger
 logger = setup_logger("main")
 
+# Settings read on hot paths, bound once at import
+_APP_NAME = settings.APP_NAME
+_APP_VERSION = settings.APP_VERSION
+_ROOT_PAYLOAD = {
+    "app": _APP_NAME,
+    "version": _APP_VERSION,
+    "api_docs": "/api/docs"
+}
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -26,97 +38,268 @@ app = FastAPI(
     docs_url="/api/docs" if settings.DEBUG else None,
     redoc_url="/api/redoc" if settings.DEBUG else None,
     openapi_url="/api/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+class FastCORSMiddleware:
+    """
+    Pure ASGI CORS middleware for a wildcard origin policy
+    
+    Simple requests get a precomputed header list appended to the response
+    start message; preflight requests are answered directly with a 204.
+    """
+    
+    ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    
+    def __init__(self, app: ASGIApp, allow_credentials: bool = True, max_age: int = 600):
+        self.app = app
+        self.allow_credentials = allow_credentials
+        
+        self.simple_headers = [(b"access-control-allow-origin", b"*")]
+        self.preflight_headers = [
+            (b"access-control-allow-methods", self.ALLOW_METHODS),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+        ]
+        if allow_credentials:
+            self.simple_headers.append((b"access-control-allow-credentials", b"true"))
+            self.preflight_headers.append((b"access-control-allow-credentials", b"true"))
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Single pass over the raw header pairs
+        origin = None
+        request_method = None
+        request_headers = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+        
+        # Not a CORS request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        # Preflight request
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = list(self.preflight_headers)
+            if self.allow_credentials:
+                # Credentialed requests cannot use a literal "*" origin
+                headers.append((b"access-control-allow-origin", origin))
+                headers.append((b"vary", b"Origin"))
+            else:
+                headers.append((b"access-control-allow-origin", b"*"))
+            if request_headers is not None:
+                headers.append((b"access-control-allow-headers", request_headers))
+            
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        # Simple request
+        if self.allow_credentials and has_cookie:
+            cors_headers = [
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin"),
+            ]
+        else:
+            cors_headers = self.simple_headers
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + cors_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
+# Add CORS middleware; the full Starlette implementation is only needed
+# when an explicit origin whitelist is configured
+if settings.CORS_ORIGINS == ["*"]:
+    app.add_middleware(FastCORSMiddleware, allow_credentials=True)
+else:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Add request logging middleware - use the class directly
 app.add_middleware(RequestLogMiddleware)
 
-# Mount API router
-app.include_router(api_router, prefix=settings.API_PREFIX)
-
-# Mount static files
-static_dir = os.path.join(os.path.dirname(__file__), "..", "frontend", "static")
-if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+class ProcessTimeMiddleware:
+    """
+    Pure ASGI middleware adding an X-Process-Time-Us header (integer microseconds)
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.perf_counter_ns()
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                elapsed_us = (time.perf_counter_ns() - start_ns) // 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time-us", str(elapsed_us).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
 
 # In-memory store for rate limiting
 RATE_LIMIT_STORE = {}
 RATE_LIMIT_LOCK = threading.Lock()
+RATE_LIMIT_WINDOW_NS = 60_000_000_000  # 1 minute
+RATE_LIMIT_IDLE_NS = 600_000_000_000  # 10 minutes
 
-# Rate limiting middleware
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    # Simple IP-based rate limiting
-    client_ip = request.client.host
-    
-    # Skip rate limiting for certain paths
-    if request.url.path.startswith("/static/") or request.url.path == "/":
-        return await call_next(request)
-    
-    # Rate limit key
-    rate_limit_key = f"rate_limit:{client_ip}"
-    
-    # Get current timestamp
-    current_time = time.time()
-    
-    # Thread-safe access to rate limit store
-    with RATE_LIMIT_LOCK:
-        # Get existing requests or empty list
-        recent_requests = RATE_LIMIT_STORE.get(rate_limit_key, [])
-        
-        # Remove requests older than 1 minute
-        recent_requests = [ts for ts in recent_requests if current_time - ts < 60]
-        
-        # Check if too many requests
-        if len(recent_requests) >= 60:  # 60 requests per minute
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Too many requests. Please try again later."}
-            )
-        
-        # Add current request
-        recent_requests.append(current_time)
-        
-        # Store updated list
-        RATE_LIMIT_STORE[rate_limit_key] = recent_requests
-        
-        # Set expiry (cleanup old entries periodically)
-        if len(RATE_LIMIT_STORE) > 1000:  # Simple cleanup to prevent memory leaks
-            keys_to_delete = []
-            for key, timestamps in RATE_LIMIT_STORE.items():
-                if not timestamps or current_time - max(timestamps) > 600:  # 10 minutes
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                del RATE_LIMIT_STORE[key]
+# Scope key under which the resolved client IP is cached for downstream middleware
+CLIENT_IP_SCOPE_KEY = "solar.client_ip"
+
+_TRUST_PROXY = settings.TRUST_PROXY
+_TRUSTED_PROXY_HOPS = max(1, settings.TRUSTED_PROXY_HOPS)
+
+# Prebuilt response for rate-limited requests
+_RATE_LIMITED_RESPONSE = ORJSONResponse(
+    status_code=429,
+    content={"detail": "Too many requests. Please try again later."}
+)
+
+def get_client_ip(scope: Scope) -> str:
+    """
+    Resolve the client IP for a request scope, caching it on the scope
+    
+    When TRUST_PROXY is enabled, uses the X-Forwarded-For entry appended by
+    the outermost of TRUSTED_PROXY_HOPS proxies, counting from the right;
+    entries left of it are client-supplied and can be spoofed. Otherwise
+    uses the socket peer address.
     
-    # Continue processing request
-    return await call_next(request)
+    Args:
+        scope: ASGI connection scope
+        
+    Returns:
+        Client IP address or "unknown"
+    """
+    client_ip = scope.get(CLIENT_IP_SCOPE_KEY)
+    if client_ip is not None:
+        return client_ip
+    
+    client_ip = None
+    if _TRUST_PROXY:
+        # Repeated headers form one list, in order
+        forwarded = [
+            value for name, value in scope["headers"] if name == b"x-forwarded-for"
+        ]
+        if forwarded:
+            entries = b",".join(forwarded).split(b",")
+            # Fewer entries than hops: the leftmost was still added by a trusted proxy
+            entry = entries[-min(_TRUSTED_PROXY_HOPS, len(entries))]
+            client_ip = entry.strip().decode("latin-1") or None
+    
+    if client_ip is None:
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+    
+    scope[CLIENT_IP_SCOPE_KEY] = client_ip
+    return client_ip
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware for simple IP-based rate limiting
+    """
     
-    # Create required directories
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Skip rate limiting for certain paths
+        path = scope["path"]
+        if path.startswith("/static/") or path == "/":
+            await self.app(scope, receive, send)
+            return
+        
+        # Rate limit key
+        rate_limit_key = f"rate_limit:{get_client_ip(scope)}"
+        
+        # Get current monotonic timestamp (integer nanoseconds, immune to clock jumps)
+        now_ns = time.monotonic_ns()
+        
+        # Thread-safe access to rate limit store
+        with RATE_LIMIT_LOCK:
+            # Get existing requests or empty list
+            recent_requests = RATE_LIMIT_STORE.get(rate_limit_key, [])
+            
+            # Remove requests older than 1 minute
+            recent_requests = [ts for ts in recent_requests if now_ns - ts < RATE_LIMIT_WINDOW_NS]
+            
+            # Check if too many requests
+            limited = len(recent_requests) >= 60  # 60 requests per minute
+            
+            if not limited:
+                # Add current request
+                recent_requests.append(now_ns)
+                
+                # Store updated list
+                RATE_LIMIT_STORE[rate_limit_key] = recent_requests
+                
+                # Set expiry (cleanup old entries periodically)
+                if len(RATE_LIMIT_STORE) > 1000:  # Simple cleanup to prevent memory leaks
+                    keys_to_delete = []
+                    for key, timestamps in RATE_LIMIT_STORE.items():
+                        if not timestamps or now_ns - max(timestamps) > RATE_LIMIT_IDLE_NS:  # 10 minutes
+                            keys_to_delete.append(key)
+                    
+                    for key in keys_to_delete:
+                        del RATE_LIMIT_STORE[key]
+        
+        if limited:
+            await _RATE_LIMITED_RESPONSE(scope, receive, send)
+            return
+        
+        # Continue processing request
+        await self.app(scope, receive, send)
+
+# Rate limiting middleware
+app.add_middleware(RateLimitMiddleware)
+
+def _create_directories() -> None:
+    """Create required data directories"""
     os.makedirs(settings.DATA_DIR, exist_ok=True)
     os.makedirs(settings.LOGS_DIR, exist_ok=True)
     os.makedirs(settings.UPLOADS_DIR, exist_ok=True)
+
+# Startup event
+@app.on_event("startup")
+async def startup_event():
+    logger.info(f"Starting {_APP_NAME} v{_APP_VERSION}")
     
-    # Create MongoDB indices
-    create_indices()
-    
-    # Initialize session indices
-    ensure_safe_indices()
+    # Create required directories, MongoDB indices and session indices
+    # concurrently; each runs blocking I/O so they go to worker threads
+    await asyncio.gather(
+        asyncio.to_thread(_create_directories),
+        asyncio.to_thread(create_indices),
+        asyncio.to_thread(ensure_safe_indices)
+    )
     
     logger.info("Application startup complete")
 
@@ -126,17 +309,12 @@ async def shutdown_event():
     logger.info("Application shutting down")
     
     # Close database connections
-    from backend.db.mongodb import close_connections
     close_connections()
 
 # Root path handler
 @app.get("/")
 async def root():
-    return {
-        "app": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "api_docs": "/api/docs"
-    }
+    return _ROOT_PAYLOAD
 
 # Health check endpoint
 @app.get("/health")
@@ -148,13 +326,20 @@ async def health_check():
     }
 
 # Add middleware to measure request time
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+app.add_middleware(ProcessTimeMiddleware)
+
+# Mount API router (after all middleware is registered)
+app.include_router(api_router, prefix=settings.API_PREFIX)
+
+# Mount static files
+# Resolved once at import so StaticFiles never sees an unnormalized ".." path
+static_dir = Path(__file__).resolve().parent.parent / "frontend" / "static"
+if static_dir.is_dir():
+    app.mount(
+        "/static",
+        StaticFiles(directory=str(static_dir), html=False, check_dir=False),
+        name="static"
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -162,9 +347,21 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
     
-    uvicorn.run(
-        "backend.main:app",
-        host=host,
-        port=port,
-        reload=settings.DEBUG
-    )
\ No newline at end of file
+    if settings.DEBUG:
+        # Reload mode is incompatible with multiple workers
+        uvicorn.run(
+            "backend.main:app",
+            host=host,
+            port=port,
+            reload=True
+        )
+    else:
+        uvicorn.run(
+            "backend.main:app",
+            host=host,
+            port=port,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            log_level="warning"
+        )
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import bm25s
+except ImportError:
+    bm25s = None
+
+from backend.utils.logging import setup_logger
+from backend.config import settings
+
+logger = setup_logger("bm25_index")
+
+class BM25Index:
+    """
+    BM25 keyword index over the documents of one Chroma collection
+    
+    Only chunk ids are kept next to the index; matching texts are fetched
+    from Chroma, so the collection's documents aren't held in memory.
+    """
+    
+    def __init__(self, ids: List[str], documents: List[str], count: int):
+        self.ids = ids
+        # Collection size when built; a different size means the index is stale
+        self.count = count
+        # "auto" picks the numba scorer when numba is installed
+        self.retriever = bm25s.BM25(backend="auto")
+        self.retriever.index(
+            bm25s.tokenize(documents, stopwords="en", return_ids=False, show_progress=False),
+            show_progress=False
+        )
+    
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Get the best matching chunks for a query
+        
+        Args:
+            query: User query
+            k: Maximum number of chunks to return
+            
+        Returns:
+            (chunk id, BM25 score) pairs, best first, scores above 0 only
+        """
+        k = min(k, len(self.ids))
+        query_tokens = bm25s.tokenize(query, stopwords="en", return_ids=False, show_progress=False)
+        if k == 0 or not query_tokens[0]:
+            return []
+        
+        indices, scores = self.retriever.retrieve(query_tokens, k=k, show_progress=False)
+        
+        return [
+            (self.ids[int(i)], float(score))
+            for i, score in zip(indices[0], scores[0])
+            if score > 0
+        ]
+
+# Indexes keyed by collection name, built on first use
+_indexes: Dict[str, BM25Index] = {}
+_index_lock = threading.Lock()
+
+def get_bm25_index(collection_name: str, collection: Any, count: int) -> Optional[BM25Index]:
+    """
+    Get the BM25 index of a collection, building it if needed
+    
+    The index is rebuilt when the collection size differs from the size it
+    was built at, which also catches changes made by other processes. This
+    reads every document of the collection, so it should run in a worker
+    thread.
+    
+    Args:
+        collection_name: Name of the vector database collection
+        collection: Chroma collection
+        count: Current number of documents in the collection
+        
+    Returns:
+        BM25 index, or None if BM25 is disabled or bm25s is not installed
+    """
+    if not settings.BM25_ENABLED or bm25s is None:
+        return None
+    
+    index = _indexes.get(collection_name)
+    if index is not None and index.count == count:
+        return index
+    
+    with _index_lock:
+        index = _indexes.get(collection_name)
+        if index is None or index.count != count:
+            start_time = time.time()
+            
+            results = collection.get(include=["documents"])
+            index = BM25Index(results["ids"], results["documents"], count)
+            _indexes[collection_name] = index
+            
+            logger.info(
+                f"Built BM25 index for {collection_name} "
+                f"({len(index.ids)} documents) in {time.time() - start_time:.2f}s"
+            )
+    
+    return index
+
+def invalidate_bm25_index(collection_name: Optional[str] = None) -> None:
+    """
+    Drop BM25 indexes so they are rebuilt on next use
+    
+    Args:
+        collection_name: Collection to drop, or None for all collections
+    """
+    with _index_lock:
+        if collection_name is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(collection_name, None)
@@ -1,19 +1,32 @@
 import os
+import re
 import time
 import asyncio
 import uuid
 import json
-from typing import List, Dict, Any, Optional, Tuple, Union, Set
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, Union, Set, AsyncIterator
 from datetime import datetime
 import traceback
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import aiofiles
-from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 import numpy as np
+from pymongo import UpdateOne
+from bson import Int64
 
 from backend.db.chromadb_client import get_chroma_client
 from backend.db.mongodb import get_database
-from backend.retrieval.pdf_processor import extract_text_from_pdf, split_text_into_chunks
+from backend.retrieval.pdf_processor import (
+    extract_text_from_pdf_parallel,
+    split_text_into_chunk_offsets,
+    stream_text_chunks
+)
+from backend.retrieval.docx_processor import extract_text_from_docx_sync
+from backend.retrieval.bm25_index import invalidate_bm25_index
 from backend.utils.logging import setup_logger
 from backend.utils.cache import get_cache, set_cache, invalidate_cache_prefix
 from backend.config import settings
@@ -21,6 +34,99 @@ from backend.models.model_loader import model_loader
 
 logger = setup_logger("document_ingestion")
 
+# Number of queued document status updates written per bulk_write
+STATUS_FLUSH_SIZE = 200
+
+# Characters read per block when streaming .txt files into the chunker
+TEXT_BLOCK_SIZE = 1 << 20
+
+# Insert batches indexed per group of chunks streamed from a .txt file;
+# several per group keep encoding and insertion pipelined
+TEXT_INDEX_GROUP_BATCHES = 4
+
+# Counter offset for chunk IDs of pieces split from long chunks, so they never
+# collide with raw chunk IDs even before the raw chunk count is known
+_SPLIT_CHUNK_ID_BASE = 1 << 31
+
+# Sentence boundary: whitespace after terminal punctuation, before a capital
+_SENT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+async def _read_text_blocks(file_path: str, block_size: int = TEXT_BLOCK_SIZE):
+    """
+    Read a UTF-8 text file in fixed-size blocks
+    
+    Args:
+        file_path: Path to the text file
+        block_size: Number of characters per block
+        
+    Yields:
+        Consecutive text blocks
+    """
+    async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            block = await f.read(block_size)
+            if not block:
+                break
+            yield block
+
+# Process pool for CPU-bound text extraction (PDF/DOCX parsing), created on
+# first use
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_lock = threading.Lock()
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Get the text extraction process pool, creating it if needed
+    
+    Workers are spawned rather than forked: this process already runs
+    database monitor threads, analytics threads and a loaded model, which
+    are not safe to fork.
+    
+    Returns:
+        Process pool
+    """
+    global _extraction_pool
+    
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    
+    return _extraction_pool
+
+def _iter_files(root: str, file_extensions: Set[str]):
+    """
+    Recursively yield paths of files under root with one of the given extensions
+    
+    Uses os.scandir so directory checks come from the cached readdir entry
+    type instead of a stat per file. Symlinked directories are not followed.
+    
+    Args:
+        root: Directory to scan
+        file_extensions: Lowercase extensions including the dot
+        
+    Yields:
+        File paths
+    """
+    exts = frozenset(file_extensions)
+    stack = [root]
+    
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                    continue
+                
+                name = entry.name
+                dot = name.rfind(".")
+                if dot > 0 and name[dot:].lower() in exts:
+                    yield entry.path
+
 class DocumentIngestionManager:
     """
     Manages the ingestion process for documents into the vector database
@@ -34,6 +140,9 @@ class DocumentIngestionManager:
     - Error handling and recovery
     """
     
+    # Status update for documents that yielded no text
+    _NO_TEXT_STATUS = {"status": "error", "error": "No text extracted from document"}
+    
     def __init__(self):
         self.chroma_client = get_chroma_client()
         self.mongodb = get_database()
@@ -48,24 +157,26 @@ class DocumentIngestionManager:
         # Create a collection to store document metadata
         self.doc_collection = self.mongodb["documents"]
         
+        # Collection mapping chunk content hashes to an already-stored embedding
+        self.chunk_hash_collection = self.mongodb["chunk_hashes"]
+        
         # Initialize vector database collection
         self._initialize_collection()
     
     def _initialize_collection(self) -> None:
         """Initialize the vector database collection"""
         try:
-            # Get list of collection names
-            collection_names = self.chroma_client.list_collections()
-            
-            # Check if collection exists
-            if self.collection_name not in collection_names:
-                logger.info(f"Creating collection: {self.collection_name}")
-                self.chroma_client.create_collection(name=self.collection_name)
+            # Get or create the collection once and keep the handle; embeddings
+            # are computed by the manager, so no embedding function is attached
+            self._collection = self.chroma_client.get_or_create_collection(
+                name=self.collection_name
+            )
             
             # Ensure index on document collection
             self.doc_collection.create_index("file_path", unique=True)
             self.doc_collection.create_index("ingestion_time")
             self.doc_collection.create_index("status")
+            self.chunk_hash_collection.create_index("hash", unique=True)
             
         except Exception as e:
             logger.error(f"Error initializing collection: {str(e)}")
@@ -75,7 +186,9 @@ class DocumentIngestionManager:
         self,
         file_path: str,
         metadata: Optional[Dict[str, Any]] = None,
-        force_reindex: bool = False
+        force_reindex: bool = False,
+        pending_ops: Optional[List[UpdateOne]] = None,
+        existing_doc: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Ingest a document into the vector database
@@ -84,17 +197,25 @@ class DocumentIngestionManager:
             file_path: Path to the document file
             metadata: Additional metadata for the document
             force_reindex: Whether to force reindexing if document already exists
+            pending_ops: Optional list to collect status updates in instead of
+                writing them immediately (flushed by the caller with bulk_write)
+            existing_doc: Existing record prefetched by the caller ({} if there
+                is none); looked up in the database when None
             
         Returns:
             Dictionary with ingestion results
         """
         start_time = time.time()
         metadata = metadata or {}
+        record = None
         
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"File not found: {file_path}")
+            # Check if file exists; filesystem and database calls below run on
+            # worker threads so concurrent ingestions don't stall the event loop
+            try:
+                file_stat = await asyncio.to_thread(os.stat, file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"File not found: {file_path}") from None
             
             # Check file format
             file_ext = os.path.splitext(file_path)[1].lower()
@@ -103,10 +224,21 @@ class DocumentIngestionManager:
             if file_ext not in supported_extensions:
                 raise ValueError(f"Unsupported file format: {file_ext}. Supported formats: {supported_extensions}")
             
-            # Check if document already exists
-            existing_doc = self.doc_collection.find_one({"file_path": file_path})
+            # Check if document already exists and is up to date
+            file_mtime = Int64(file_stat.st_mtime_ns // 1_000_000)
+            if existing_doc is None:
+                existing_doc = await asyncio.to_thread(
+                    self.doc_collection.find_one,
+                    {"file_path": file_path},
+                    {"_id": 0, "document_id": 1, "status": 1, "file_mtime": 1}
+                )
             
-            if existing_doc and existing_doc.get("status") == "completed" and not force_reindex:
+            if (
+                existing_doc
+                and existing_doc.get("status") == "completed"
+                and existing_doc.get("file_mtime", file_mtime) >= file_mtime
+                and not force_reindex
+            ):
                 logger.info(f"Document already indexed: {file_path}")
                 return {
                     "file_path": file_path,
@@ -115,80 +247,95 @@ class DocumentIngestionManager:
                     "message": "Document already indexed"
                 }
             
+            # Chunks of a previously indexed version are replaced below
+            previous_document_id = (existing_doc or {}).get("document_id")
+            
             # Generate document ID
             document_id = str(uuid.uuid4())
             
             # Update document status in database
-            self.doc_collection.update_one(
-                {"file_path": file_path},
-                {
-                    "$set": {
-                        "document_id": document_id,
-                        "file_path": file_path,
-                        "file_name": os.path.basename(file_path),
-                        "file_extension": file_ext,
-                        "status": "processing",
-                        "ingestion_time": datetime.utcnow(),
-                        "metadata": metadata
-                    }
-                },
-                upsert=True
-            )
+            record = {
+                "document_id": document_id,
+                "file_path": file_path,
+                "file_name": os.path.basename(file_path),
+                "file_extension": file_ext,
+                "status": "processing",
+                "ingestion_time": datetime.utcnow(),
+                "file_mtime": file_mtime,
+                "metadata": metadata
+            }
             
-            # Extract text based on file format
-            if file_ext == ".pdf":
-                text, page_map = await extract_text_from_pdf(file_path)
-            elif file_ext == ".txt":
-                async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                    text = await f.read()
-                page_map = None
-            elif file_ext == ".docx":
-                # For simplicity, we'll just use basic text extraction for DOCX
-                # In a production system, use specialized libraries like python-docx
-                from docx import Document
-                doc = Document(file_path)
-                text = "\n\n".join([para.text for para in doc.paragraphs])
-                page_map = None
-            
-            # Split text into chunks
-            chunks = await self._create_optimized_chunks(text, page_map)
-            
-            if not chunks:
-                logger.warning(f"No chunks created from document: {file_path}")
-                self.doc_collection.update_one(
+            if pending_ops is None:
+                await asyncio.to_thread(
+                    self.doc_collection.update_one,
                     {"file_path": file_path},
-                    {"$set": {"status": "error", "error": "No text extracted from document"}}
+                    {"$set": record},
+                    upsert=True
                 )
+            
+            # Extract text based on file format; PDF and DOCX parsing is
+            # CPU-bound, so it runs in the process pool to escape the GIL
+            loop = asyncio.get_running_loop()
+            if file_ext == ".txt":
+                # Stream the file into the chunker and index the chunks in
+                # groups as they arrive instead of reading it whole
+                chunks_count = await self._index_text_file(file_path, document_id, metadata)
+            else:
+                if file_ext == ".pdf":
+                    # Large PDFs are split into page ranges across the pool
+                    text, page_map = await extract_text_from_pdf_parallel(
+                        file_path, _get_extraction_pool()
+                    )
+                elif file_ext == ".docx":
+                    text, page_map = await loop.run_in_executor(
+                        _get_extraction_pool(), extract_text_from_docx_sync, file_path
+                    )
+                
+                # Split text into chunks
+                chunks = await self._create_optimized_chunks(text, page_map, document_id)
+                
+                # Generate embeddings and store in vector database
+                if chunks:
+                    await self._index_chunks(chunks, document_id, file_path, metadata)
+                chunks_count = len(chunks)
+            
+            if not chunks_count:
+                logger.warning(f"No chunks created from document: {file_path}")
+                await self._update_status(file_path, self._NO_TEXT_STATUS, record, pending_ops)
                 return {
                     "file_path": file_path,
                     "status": "error",
                     "message": "No text extracted from document"
                 }
             
-            # Generate embeddings and store in vector database
-            result = await self._index_chunks(chunks, document_id, file_path, metadata)
+            # Drop the replaced version's chunks only now, so its unchanged
+            # chunks could lend their embeddings to the new version
+            if previous_document_id:
+                await asyncio.to_thread(self._delete_document_chunks, previous_document_id)
             
             # Update document status
-            self.doc_collection.update_one(
-                {"file_path": file_path},
+            await self._update_status(
+                file_path,
                 {
-                    "$set": {
-                        "status": "completed",
-                        "chunks_count": len(chunks),
-                        "completion_time": datetime.utcnow(),
-                        "processing_time": time.time() - start_time
-                    }
-                }
+                    "status": "completed",
+                    "chunks_count": chunks_count,
+                    "completion_time": datetime.utcnow(),
+                    "processing_time": time.time() - start_time
+                },
+                record,
+                pending_ops
             )
             
             # Invalidate related caches
             invalidate_cache_prefix("query_chunks:")
+            invalidate_cache_prefix("collection_count:")
+            invalidate_bm25_index()
             
             return {
                 "file_path": file_path,
                 "document_id": document_id,
                 "status": "completed",
-                "chunks_count": len(chunks),
+                "chunks_count": chunks_count,
                 "processing_time": time.time() - start_time
             }
             
@@ -197,9 +344,11 @@ class DocumentIngestionManager:
             logger.error(traceback.format_exc())
             
             # Update document status
-            self.doc_collection.update_one(
-                {"file_path": file_path},
-                {"$set": {"status": "error", "error": str(e)}}
+            await self._update_status(
+                file_path,
+                {"status": "error", "error": str(e)},
+                record,
+                pending_ops
             )
             
             return {
@@ -208,10 +357,46 @@ class DocumentIngestionManager:
                 "error": str(e)
             }
     
+    async def _update_status(
+        self,
+        file_path: str,
+        fields: Dict[str, Any],
+        record: Optional[Dict[str, Any]],
+        pending_ops: Optional[List[UpdateOne]]
+    ) -> None:
+        """
+        Write a document status update, or queue it for a later bulk_write
+        
+        Args:
+            file_path: Path to the document file
+            fields: Fields to set
+            record: Initial document record (not yet written when batching)
+            pending_ops: Optional list collecting batched updates
+        """
+        if pending_ops is None:
+            await asyncio.to_thread(
+                self.doc_collection.update_one,
+                {"file_path": file_path},
+                {"$set": fields}
+            )
+        elif record is not None:
+            # The processing record was never written, so upsert it with the final status
+            pending_ops.append(UpdateOne(
+                {"file_path": file_path},
+                {"$set": {**record, **fields}},
+                upsert=True
+            ))
+        else:
+            pending_ops.append(UpdateOne(
+                {"file_path": file_path},
+                {"$set": fields}
+            ))
+    
     async def _create_optimized_chunks(
         self,
         text: str,
-        page_map: Optional[Dict[int, int]] = None
+        page_map: Optional[Dict[int, int]] = None,
+        document_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Create optimized chunks from document text
@@ -219,169 +404,251 @@ class DocumentIngestionManager:
         Args:
             text: Document text
             page_map: Mapping of text positions to page numbers
+            document_id: Document ID used to derive chunk IDs
             
         Returns:
             List of chunk dictionaries
         """
-        # Split text into initial chunks
-        raw_chunks = split_text_into_chunks(
+        # Compute initial chunk boundaries; text is only sliced per chunk below
+        chunk_offsets = split_text_into_chunk_offsets(
             text, 
             chunk_size=self.chunk_size, 
             chunk_overlap=self.chunk_overlap
         )
         
-        # Process chunks with optimizations
-        optimized_chunks = []
+        # Page number of each raw chunk: the page whose start position is
+        # closest to the chunk's start offset, found with one binary search
+        chunk_pages = self._assign_pages(chunk_offsets[:, 0], page_map) if page_map else None
+        
+        async def _raw_chunks() -> AsyncIterator[Tuple[str, Optional[int]]]:
+            for i, (start, end) in enumerate(chunk_offsets.tolist()):
+                yield text[start:end], int(chunk_pages[i]) if chunk_pages is not None else None
+        
+        return [chunk async for chunk in self._optimize_chunks(_raw_chunks(), document_id)]
+    
+    async def _index_text_file(
+        self,
+        file_path: str,
+        document_id: str,
+        metadata: Dict[str, Any]
+    ) -> int:
+        """
+        Stream a .txt file through chunking, embedding and insertion
+        
+        Chunks are indexed in fixed-size groups as they are produced, so
+        memory stays bounded by the group size rather than the file size.
+        
+        Args:
+            file_path: Path to the text file
+            document_id: Document ID
+            metadata: Additional metadata
+            
+        Returns:
+            Number of chunks indexed
+        """
+        async def _raw_chunks() -> AsyncIterator[Tuple[str, Optional[int]]]:
+            async for chunk_text in stream_text_chunks(
+                _read_text_blocks(file_path),
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap
+            ):
+                yield chunk_text, None
+        
+        group_size = settings.INGEST_BATCH_SIZE * TEXT_INDEX_GROUP_BATCHES
+        group = []
+        chunks_count = 0
+        
+        async for chunk in self._optimize_chunks(_raw_chunks(), document_id):
+            group.append(chunk)
+            if len(group) >= group_size:
+                await self._index_chunks(group, document_id, file_path, metadata)
+                chunks_count += len(group)
+                group = []
+        
+        if group:
+            await self._index_chunks(group, document_id, file_path, metadata)
+            chunks_count += len(group)
+        
+        return chunks_count
+    
+    async def _optimize_chunks(
+        self,
+        raw_chunks: AsyncIterator[Tuple[str, Optional[int]]],
+        document_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Turn raw chunks into chunk dictionaries as they arrive
+        
+        Very short chunks are merged with the next chunk on the same page and
+        overly long chunks are split at logical boundaries.
+        
+        Args:
+            raw_chunks: Raw chunk texts with their page numbers
+            document_id: Document ID used to derive chunk IDs
+            
+        Yields:
+            Chunk dictionaries
+        """
+        # Chunk IDs are derived from a per-document BLAKE2b seed and a counter
+        # instead of drawing a random UUID for every chunk
+        id_seed = (
+            hashlib.blake2b(document_id.encode("utf-8"), digest_size=16).digest()
+            if document_id else os.urandom(16)
+        )
+        
+        def _chunk_id(n: int) -> str:
+            return hashlib.blake2b(id_seed + n.to_bytes(4, "little"), digest_size=16).hexdigest()
+        
+        # Counters of split pieces and of chunks yielded so far
+        next_id = _SPLIT_CHUNK_ID_BASE
+        emitted = 0
         
-        for i, chunk_text in enumerate(raw_chunks):
+        def _split(chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+            # Split overly long chunks at logical boundaries
+            nonlocal next_id
+            
+            if len(chunk["text"]) <= self.chunk_size * 1.5:
+                return [chunk]
+            
+            # Split at paragraph or sentence boundaries
+            paragraphs = chunk["text"].split("\n\n")
+            
+            if len(paragraphs) > 1:
+                # Split at paragraph boundaries
+                pieces = self._pack_segments(paragraphs, "\n\n")
+            else:
+                # If no paragraph breaks, split at sentence boundaries
+                sentences = _SENT_RE.split(chunk["text"])
+                pieces = self._pack_segments(sentences, " ")
+            
+            split_chunks = []
+            for piece in pieces:
+                split_chunks.append({
+                    "text": piece,
+                    "metadata": {
+                        "chunk_id": _chunk_id(next_id),
+                        "chunk_index": emitted + len(split_chunks),
+                        "page": chunk["metadata"]["page"],
+                        "parent_chunk_id": chunk["metadata"]["chunk_id"]
+                    }
+                })
+                next_id += 1
+            return split_chunks
+        
+        # Chunk held back until the next one shows whether it merges
+        pending = None
+        i = 0
+        
+        async for chunk_text, page_num in raw_chunks:
+            index = i
+            i += 1
+            
             # Skip empty chunks
             if not chunk_text.strip():
                 continue
             
-            # Determine page number if page map is available
-            page_num = None
-            if page_map:
-                chunk_start = sum(len(c) for c in raw_chunks[:i])
-                if chunk_start in page_map:
-                    page_num = page_map[chunk_start]
-                else:
-                    # Find closest position
-                    positions = list(page_map.keys())
-                    closest_pos = min(positions, key=lambda x: abs(x - chunk_start))
-                    page_num = page_map[closest_pos]
-            
-            # Create chunk dictionary
             chunk = {
                 "text": chunk_text,
                 "metadata": {
-                    "chunk_id": str(uuid.uuid4()),
-                    "chunk_index": i,
+                    "chunk_id": _chunk_id(index),
+                    "chunk_index": index,
                     "page": page_num
                 }
             }
             
-            optimized_chunks.append(chunk)
+            if pending is None:
+                pending = chunk
+                continue
+            
+            # Merge a very short chunk with its neighbor if pages match (or both are None)
+            if len(pending["text"]) < 100 and pending["metadata"]["page"] == page_num:
+                ready = {
+                    "text": pending["text"] + " " + chunk_text,
+                    "metadata": {**pending["metadata"], "merged": True}
+                }
+                pending = None
+            else:
+                ready = pending
+                pending = chunk
+            
+            for piece in _split(ready):
+                yield piece
+                emitted += 1
         
-        # Apply additional optimizations:
+        if pending is not None:
+            for piece in _split(pending):
+                yield piece
+                emitted += 1
+    
+    def _pack_segments(self, segments: List[str], separator: str) -> List[str]:
+        """
+        Greedily pack text segments into pieces shorter than the chunk size
         
-        # 1. Merge very short chunks with their neighbors
-        merged_chunks = []
-        skip_next = False
+        Segments are buffered in a list and joined once per piece instead of
+        growing a string with repeated concatenation.
         
-        for i in range(len(optimized_chunks)):
-            if skip_next:
-                skip_next = False
-                continue
-            
-            chunk = optimized_chunks[i]
+        Args:
+            segments: Paragraphs or sentences in document order
+            separator: String used to join segments within a piece
             
-            # If this is a very short chunk and not the last one, try to merge
-            if len(chunk["text"]) < 100 and i < len(optimized_chunks) - 1:
-                next_chunk = optimized_chunks[i + 1]
-                
-                # If pages match (or both are None), merge chunks
-                if chunk["metadata"]["page"] == next_chunk["metadata"]["page"]:
-                    merged_text = chunk["text"] + " " + next_chunk["text"]
-                    new_chunk = {
-                        "text": merged_text,
-                        "metadata": {
-                            "chunk_id": chunk["metadata"]["chunk_id"],
-                            "chunk_index": chunk["metadata"]["chunk_index"],
-                            "page": chunk["metadata"]["page"],
-                            "merged": True
-                        }
-                    }
-                    merged_chunks.append(new_chunk)
-                    skip_next = True
+        Returns:
+            List of packed text pieces
+        """
+        pieces = []
+        buf = []
+        current_len = 0
+        separator_len = len(separator)
+        
+        for segment in segments:
+            if current_len + len(segment) < self.chunk_size:
+                if current_len:
+                    buf.append(segment)
+                    current_len += separator_len + len(segment)
                 else:
-                    merged_chunks.append(chunk)
+                    buf = [segment]
+                    current_len = len(segment)
             else:
-                merged_chunks.append(chunk)
+                # Flush current piece
+                if current_len:
+                    pieces.append(separator.join(buf))
+                
+                buf = [segment]
+                current_len = len(segment)
         
-        # 2. Split overly long chunks at logical boundaries
-        final_chunks = []
+        # Add the last piece
+        if current_len:
+            pieces.append(separator.join(buf))
         
-        for chunk in merged_chunks:
-            if len(chunk["text"]) > self.chunk_size * 1.5:
-                # Split at paragraph or sentence boundaries
-                paragraphs = chunk["text"].split("\n\n")
-                
-                if len(paragraphs) > 1:
-                    # Split at paragraph boundaries
-                    current_text = ""
-                    for para in paragraphs:
-                        if len(current_text) + len(para) < self.chunk_size:
-                            if current_text:
-                                current_text += "\n\n" + para
-                            else:
-                                current_text = para
-                        else:
-                            # Add current chunk
-                            if current_text:
-                                final_chunks.append({
-                                    "text": current_text,
-                                    "metadata": {
-                                        "chunk_id": str(uuid.uuid4()),
-                                        "chunk_index": len(final_chunks),
-                                        "page": chunk["metadata"]["page"],
-                                        "parent_chunk_id": chunk["metadata"]["chunk_id"]
-                                    }
-                                })
-                            
-                            current_text = para
-                    
-                    # Add the last chunk
-                    if current_text:
-                        final_chunks.append({
-                            "text": current_text,
-                            "metadata": {
-                                "chunk_id": str(uuid.uuid4()),
-                                "chunk_index": len(final_chunks),
-                                "page": chunk["metadata"]["page"],
-                                "parent_chunk_id": chunk["metadata"]["chunk_id"]
-                            }
-                        })
-                else:
-                    # If no paragraph breaks, split at sentence boundaries
-                    sentences = chunk["text"].replace(". ", ".\n").split("\n")
-                    
-                    current_text = ""
-                    for sentence in sentences:
-                        if len(current_text) + len(sentence) < self.chunk_size:
-                            if current_text:
-                                current_text += " " + sentence
-                            else:
-                                current_text = sentence
-                        else:
-                            # Add current chunk
-                            if current_text:
-                                final_chunks.append({
-                                    "text": current_text,
-                                    "metadata": {
-                                        "chunk_id": str(uuid.uuid4()),
-                                        "chunk_index": len(final_chunks),
-                                        "page": chunk["metadata"]["page"],
-                                        "parent_chunk_id": chunk["metadata"]["chunk_id"]
-                                    }
-                                })
-                            
-                            current_text = sentence
-                    
-                    # Add the last chunk
-                    if current_text:
-                        final_chunks.append({
-                            "text": current_text,
-                            "metadata": {
-                                "chunk_id": str(uuid.uuid4()),
-                                "chunk_index": len(final_chunks),
-                                "page": chunk["metadata"]["page"],
-                                "parent_chunk_id": chunk["metadata"]["chunk_id"]
-                            }
-                        })
-            else:
-                final_chunks.append(chunk)
+        return pieces
+    
+    @staticmethod
+    def _assign_pages(starts: np.ndarray, page_map: Dict[int, int]) -> np.ndarray:
+        """
+        Map each chunk to the page whose start position is closest to the chunk start
+        
+        Args:
+            starts: Start offset of each chunk in the document text
+            page_map: Mapping of text positions to page numbers
+            
+        Returns:
+            Array of page numbers aligned with starts
+        """
+        # Page start positions, sorted, with their page numbers aligned
+        pos_arr = np.fromiter(page_map.keys(), dtype=np.int64, count=len(page_map))
+        page_arr = np.fromiter(page_map.values(), dtype=np.int64, count=len(page_map))
+        order = np.argsort(pos_arr, kind="stable")
+        pos_arr = pos_arr[order]
+        page_arr = page_arr[order]
         
-        return final_chunks
+        # Closest of the neighbouring positions; ties go to the earlier page
+        right = np.searchsorted(pos_arr, starts)
+        left = np.maximum(right - 1, 0)
+        right_clipped = np.minimum(right, len(pos_arr) - 1)
+        use_right = (right < len(pos_arr)) & (
+            (right == 0) | (pos_arr[right_clipped] - starts < starts - pos_arr[left])
+        )
+        
+        return np.where(use_right, page_arr[right_clipped], page_arr[left])
     
     async def _index_chunks(
         self,
@@ -405,46 +672,56 @@ class DocumentIngestionManager:
         try:
             # Get embedding model
             model_dict = model_loader.get_embedding_model()
-            embedding_function = model_dict["model"].encode
+            embedding_model = model_dict["model"]
             
-            # Get or create collection
-            collection = self.chroma_client.get_or_create_collection(
-                name=self.collection_name,
-                embedding_function=embedding_function
-            )
+            # Use the cached collection handle
+            collection = self._collection
             
             # Prepare data for batch insertion
             ids = []
             texts = []
             metadatas = []
             
+            # Document-level metadata shared by every chunk; additional
+            # metadata still takes precedence over the per-chunk fields
+            base_metadata = {
+                "document_id": document_id,
+                "source": file_path,
+                **metadata
+            }
+            
             for chunk in chunks:
-                chunk_id = chunk["metadata"]["chunk_id"]
-                ids.append(chunk_id)
+                chunk_meta = chunk["metadata"]
+                ids.append(chunk_meta["chunk_id"])
                 texts.append(chunk["text"])
                 
                 # Create metadata
                 chunk_metadata = {
-                    "document_id": document_id,
-                    "source": file_path,
-                    "page": chunk["metadata"].get("page"),
-                    "chunk_index": chunk["metadata"]["chunk_index"]
+                    "page": chunk_meta.get("page"),
+                    "chunk_index": chunk_meta["chunk_index"]
                 }
-                
-                # Add any additional metadata
-                chunk_metadata.update(metadata)
+                chunk_metadata.update(base_metadata)
                 
                 metadatas.append(chunk_metadata)
             
-            # Add documents to collection
-            collection.add(
-                ids=ids,
-                documents=texts,
-                metadatas=metadatas
+            # Reuse embeddings of chunks whose content was already indexed
+            hashes = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest() for text in texts]
+            cached_embeddings = await asyncio.to_thread(
+                self._lookup_cached_embeddings, collection, hashes
+            )
+            
+            # Insert in fixed-size batches, encoding batch N+1 on a worker
+            # thread while batch N is being added to the collection
+            await self._add_in_batches(
+                collection, embedding_model, ids, texts, metadatas, cached_embeddings
             )
             
+            # Record content hashes for future deduplication
+            await asyncio.to_thread(self._record_chunk_hashes, hashes, ids, document_id)
+            
             return {
                 "indexed_chunks": len(chunks),
+                "reused_embeddings": len(cached_embeddings),
                 "document_id": document_id
             }
             
@@ -452,6 +729,164 @@ class DocumentIngestionManager:
             logger.error(f"Error indexing chunks: {str(e)}")
             raise
     
+    async def _add_in_batches(
+        self,
+        collection: Any,
+        embedding_model: Any,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        cached_embeddings: Optional[Dict[int, List[float]]] = None
+    ) -> None:
+        """
+        Encode and add chunks to the collection in pipelined batches
+        
+        Args:
+            collection: Vector database collection
+            embedding_model: Sentence embedding model
+            ids: Chunk IDs
+            texts: Chunk texts
+            metadatas: Chunk metadata dictionaries
+            cached_embeddings: Already known embeddings keyed by chunk position
+        """
+        batch_size = settings.INGEST_BATCH_SIZE
+        cached_embeddings = cached_embeddings or {}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        
+        async def _produce() -> None:
+            try:
+                for start in range(0, len(texts), batch_size):
+                    end = min(start + batch_size, len(texts))
+                    
+                    # Only encode chunks without a cached embedding
+                    missing = [i for i in range(start, end) if i not in cached_embeddings]
+                    encoded = {}
+                    if missing:
+                        vectors = await asyncio.to_thread(
+                            embedding_model.encode,
+                            [texts[i] for i in missing],
+                            batch_size=settings.EMBED_BATCH_SIZE,
+                            convert_to_numpy=True,
+                            normalize_embeddings=True,
+                            show_progress_bar=False
+                        )
+                        encoded = dict(zip(missing, vectors.tolist()))
+                    
+                    embeddings = [
+                        cached_embeddings[i] if i in cached_embeddings else encoded[i]
+                        for i in range(start, end)
+                    ]
+                    await queue.put((start, end, embeddings))
+            except Exception as e:
+                await queue.put(e)
+                return
+            
+            await queue.put(None)
+        
+        producer = asyncio.create_task(_produce())
+        
+        try:
+            while True:
+                item = await queue.get()
+                
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                start, end, embeddings = item
+                await asyncio.to_thread(
+                    collection.add,
+                    ids=ids[start:end],
+                    documents=texts[start:end],
+                    metadatas=metadatas[start:end],
+                    embeddings=embeddings
+                )
+        except BaseException:
+            producer.cancel()
+            raise
+    
+    def _lookup_cached_embeddings(
+        self,
+        collection: Any,
+        hashes: List[str]
+    ) -> Dict[int, List[float]]:
+        """
+        Find stored embeddings for chunks whose content hash was already indexed
+        
+        Args:
+            collection: Vector database collection
+            hashes: Content hash of each chunk
+            
+        Returns:
+            Dictionary mapping chunk position to its existing embedding
+        """
+        try:
+            # One round trip for all hashes of this document
+            known = {
+                doc["hash"]: doc["chunk_id"]
+                for doc in self.chunk_hash_collection.find(
+                    {"hash": {"$in": list(set(hashes))}},
+                    {"_id": 0, "hash": 1, "chunk_id": 1}
+                )
+            }
+            
+            if not known:
+                return {}
+            
+            # Fetch the referenced vectors; chunks deleted since are simply missing
+            result = collection.get(ids=list(set(known.values())), include=["embeddings"])
+            vectors = {
+                chunk_id: np.asarray(embedding, dtype=float).tolist()
+                for chunk_id, embedding in zip(result["ids"], result["embeddings"])
+            }
+            
+            cached = {}
+            for i, content_hash in enumerate(hashes):
+                chunk_id = known.get(content_hash)
+                if chunk_id in vectors:
+                    cached[i] = vectors[chunk_id]
+            
+            return cached
+            
+        except Exception as e:
+            logger.warning(f"Error looking up cached chunk embeddings: {str(e)}")
+            return {}
+    
+    def _record_chunk_hashes(
+        self,
+        hashes: List[str],
+        ids: List[str],
+        document_id: str
+    ) -> None:
+        """
+        Store content hashes of indexed chunks
+        
+        Args:
+            hashes: Content hash of each chunk
+            ids: Chunk IDs
+            document_id: Document ID
+        """
+        try:
+            ops = [
+                UpdateOne(
+                    {"hash": content_hash},
+                    {
+                        # Point at the newest chunk, which outlives a replaced version
+                        "$set": {"chunk_id": chunk_id},
+                        "$addToSet": {"document_ids": document_id}
+                    },
+                    upsert=True
+                )
+                for content_hash, chunk_id in zip(hashes, ids)
+            ]
+            
+            if ops:
+                self.chunk_hash_collection.bulk_write(ops, ordered=False)
+                
+        except Exception as e:
+            logger.warning(f"Error recording chunk hashes: {str(e)}")
+    
     async def ingest_directory(
         self,
         directory_path: str,
@@ -481,11 +916,7 @@ class DocumentIngestionManager:
                 raise NotADirectoryError(f"Directory not found: {directory_path}")
             
             # Get all files with supported extensions
-            files = []
-            for root, _, filenames in os.walk(directory_path):
-                for filename in filenames:
-                    if os.path.splitext(filename)[1].lower() in file_extensions:
-                        files.append(os.path.join(root, filename))
+            files = await asyncio.to_thread(list, _iter_files(directory_path, file_extensions))
             
             if not files:
                 logger.warning(f"No supported files found in directory: {directory_path}")
@@ -496,32 +927,59 @@ class DocumentIngestionManager:
                     "message": "No supported files found"
                 }
             
-            # Process files
-            results = []
-            for file_path in tqdm(files, desc="Processing files"):
-                try:
-                    # Add base directory to metadata
-                    file_metadata = metadata.copy()
-                    file_metadata["base_directory"] = directory_path
-                    
-                    result = await self.ingest_document(
-                        file_path,
-                        metadata=file_metadata,
-                        force_reindex=force_reindex
+            # Look up known files in one query instead of one per file; even
+            # when reindexing, their document IDs locate the chunks to replace
+            existing_docs = {
+                doc["file_path"]: doc
+                for doc in await asyncio.to_thread(
+                    list,
+                    self.doc_collection.find(
+                        {"file_path": {"$in": files}},
+                        {"_id": 0, "file_path": 1, "document_id": 1, "status": 1, "file_mtime": 1}
                     )
-                    
-                    results.append(result)
-                    
-                    # Sleep briefly to avoid overloading the system
-                    await asyncio.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {str(e)}")
-                    results.append({
-                        "file_path": file_path,
-                        "status": "error",
-                        "error": str(e)
-                    })
+                )
+            }
+            
+            # Process files concurrently with bounded parallelism,
+            # collecting status updates for bulk writes
+            pending_ops = []
+            semaphore = asyncio.Semaphore(settings.INGEST_CONCURRENCY)
+            
+            async def _ingest_one(file_path: str) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        # Add base directory to metadata
+                        file_metadata = metadata.copy()
+                        file_metadata["base_directory"] = directory_path
+                        
+                        result = await self.ingest_document(
+                            file_path,
+                            metadata=file_metadata,
+                            force_reindex=force_reindex,
+                            pending_ops=pending_ops,
+                            existing_doc=existing_docs.get(file_path, {})
+                        )
+                        
+                        if len(pending_ops) >= STATUS_FLUSH_SIZE:
+                            await self._flush_status_updates(pending_ops)
+                        
+                        return result
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing file {file_path}: {str(e)}")
+                        return {
+                            "file_path": file_path,
+                            "status": "error",
+                            "error": str(e)
+                        }
+            
+            results = await tqdm_asyncio.gather(
+                *[_ingest_one(file_path) for file_path in files],
+                desc="Processing files"
+            )
+            
+            # Write remaining status updates
+            await self._flush_status_updates(pending_ops)
             
             # Summarize results
             success_count = sum(1 for r in results if r.get("status") in ["completed", "exists"])
@@ -545,6 +1003,25 @@ class DocumentIngestionManager:
                 "error": str(e)
             }
     
+    async def _flush_status_updates(self, pending_ops: List[UpdateOne]) -> None:
+        """
+        Write queued document status updates in one bulk_write
+        
+        Args:
+            pending_ops: Queued updates; cleared after writing
+        """
+        if not pending_ops:
+            return
+        
+        # Take the queued updates on the event loop, where they are appended
+        ops = pending_ops[:]
+        pending_ops.clear()
+        
+        try:
+            await asyncio.to_thread(self.doc_collection.bulk_write, ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Error writing document status updates: {str(e)}")
+    
     async def get_document_status(self, document_id: str) -> Dict[str, Any]:
         """
         Get the status of a document
@@ -605,31 +1082,23 @@ class DocumentIngestionManager:
                     "message": "Document not found"
                 }
             
-            # Get collection
-            collection = self.chroma_client.get_collection(name=self.collection_name)
-            
-            # Get all chunks for this document
-            result = collection.get(
-                where={"document_id": document_id},
-                include=["documents", "metadatas", "embeddings"]
-            )
+            chunks_deleted = self._delete_document_chunks(document_id)
             
-            if not result or not result["ids"]:
+            if not chunks_deleted:
                 logger.warning(f"No chunks found for document: {document_id}")
-            else:
-                # Delete chunks from collection
-                collection.delete(ids=result["ids"])
             
             # Delete document from database
             self.doc_collection.delete_one({"document_id": document_id})
             
             # Invalidate related caches
             invalidate_cache_prefix("query_chunks:")
+            invalidate_cache_prefix("collection_count:")
+            invalidate_bm25_index()
             
             return {
                 "document_id": document_id,
                 "status": "deleted",
-                "chunks_deleted": len(result["ids"]) if result and "ids" in result else 0
+                "chunks_deleted": chunks_deleted
             }
             
         except Exception as e:
@@ -640,6 +1109,35 @@ class DocumentIngestionManager:
                 "error": str(e)
             }
     
+    def _delete_document_chunks(self, document_id: str) -> int:
+        """
+        Delete a document's chunks and the hash entries that reference them
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            Number of chunks deleted
+        """
+        # Use the cached collection handle
+        collection = self._collection
+        
+        # Get the IDs of all chunks for this document (no payload needed)
+        result = collection.get(
+            where={"document_id": document_id},
+            include=[]
+        )
+        ids = result["ids"] if result else []
+        
+        if ids:
+            # Delete chunks from collection
+            collection.delete(ids=ids)
+            
+            # Drop hash entries that reference the deleted chunks
+            self.chunk_hash_collection.delete_many({"chunk_id": {"$in": ids}})
+        
+        return len(ids)
+    
     async def get_all_documents(self) -> List[Dict[str, Any]]:
         """
         Get all documents in the system
@@ -680,8 +1178,8 @@ class DocumentIngestionManager:
             List of chunk dictionaries
         """
         try:
-            # Get collection
-            collection = self.chroma_client.get_collection(name=self.collection_name)
+            # Use the cached collection handle
+            collection = self._collection
             
             # Get all chunks for this document
             result = collection.get(
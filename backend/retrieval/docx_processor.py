@@ -0,0 +1,25 @@
+from typing import Tuple
+
+try:
+    from docx import Document as _DocxDocument
+except ImportError:
+    _DocxDocument = None
+
+def extract_text_from_docx_sync(file_path: str) -> Tuple[str, None]:
+    """
+    Extract paragraph text from a DOCX file
+    
+    Kept apart from document_ingestion so extraction pool workers can
+    import it without building the ingestion manager.
+    
+    Args:
+        file_path: Path to the DOCX file
+        
+    Returns:
+        Tuple of extracted text and page mapping (always None for DOCX)
+    """
+    if _DocxDocument is None:
+        raise ValueError("DOCX support requires the python-docx package")
+    
+    doc = _DocxDocument(file_path)
+    return "\n\n".join([para.text for para in doc.paragraphs]), None
\ No newline at end of file
@@ -1,12 +1,16 @@
 import os
-import json
+import re
 import logging
 import traceback
+import functools
+from bisect import bisect_left
 from collections import Counter
-from typing import Dict, Tuple, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Tuple, Any, List, Optional, Mapping
+import aiofiles
+import orjson
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 
 from ..config import config
 
@@ -16,11 +20,23 @@ logger = logging.getLogger(__name__)
 # Download NLTK resources (with error handling)
 try:
     nltk.download('stopwords', quiet=True)
-    nltk.download('punkt', quiet=True)
 except Exception as e:
     logger.warning(f"Warning: Failed to download NLTK resources: {e}")
 
-def load_meta_index() -> Dict[str, Any]:
+# Build the stopword set once instead of re-reading the corpus per query
+try:
+    _STOP_WORDS = frozenset(stopwords.words('english'))
+except Exception as e:
+    logger.warning(f"Warning: Failed to load NLTK stopwords: {e}")
+    _STOP_WORDS = None
+
+# Lowercase alphanumeric runs; all the keyword matching needs from a tokenizer
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Keywords shorter than this only match whole tokens, not token prefixes
+_MIN_PREFIX_LEN = 3
+
+async def load_meta_index() -> Dict[str, Any]:
     """
     Load the meta index with error handling.
     
@@ -28,28 +44,32 @@ def load_meta_index() -> Dict[str, Any]:
         Dict[str, Any]: The loaded meta index or an empty dict if loading fails
     """
     try:
-        meta_index_path = config.META_INDEX_PATH
+        # Configured location first, then the alternative locations
+        candidates = [
+            config.META_INDEX_PATH,
+            os.path.join(os.path.dirname(__file__), "../vector_db/meta_index.json"),
+            "backend/vector_db/meta_index.json",
+            "data/vector_db/meta_index.json"
+        ]
+        meta_index_path = next((path for path in candidates if os.path.exists(path)), None)
         
-        if not os.path.exists(meta_index_path):
-            # Try alternative locations
-            alt_paths = [
-                os.path.join(os.path.dirname(__file__), "../vector_db/meta_index.json"),
-                "backend/vector_db/meta_index.json",
-                "data/vector_db/meta_index.json"
-            ]
-            
-            for path in alt_paths:
-                if os.path.exists(path):
-                    meta_index_path = path
-                    break
-            else:
-                logger.warning(f"⚠️ Meta index file not found at {meta_index_path} or alternative locations")
-                return {}
+        if meta_index_path is None:
+            logger.warning(f"⚠️ Meta index file not found at {config.META_INDEX_PATH} or alternative locations")
+            return {}
         
-        with open(meta_index_path, 'r') as f:
-            meta_index = json.load(f)
-            logger.info(f"✅ Successfully loaded meta index with {len(meta_index)} databases")
-            return meta_index
+        async with aiofiles.open(meta_index_path, 'rb') as f:
+            meta_index = orjson.loads(await f.read())
+        
+        # Cached matches refer to the previous meta index
+        _match_keywords_cached.cache_clear()
+        _get_token_index.cache_clear()
+        _get_token_vocabulary.cache_clear()
+        _get_collection_positions.cache_clear()
+        
+        # Build the token index now rather than on the first query
+        _get_token_vocabulary(_MetaIndexKey(meta_index))
+        logger.info(f"✅ Successfully loaded meta index with {len(meta_index)} databases")
+        return meta_index
     except Exception as e:
         logger.error(f"❌ Error loading meta index: {e}")
         logger.error(traceback.format_exc())
@@ -73,6 +93,23 @@ def get_collection_schema(meta_index: Dict[str, Any], db_name: str, collection_n
         logger.error(f"❌ Error getting collection schema: {e}")
         return {}
 
+@functools.lru_cache(maxsize=4096)
+def _extract_keywords_cached(query: str) -> Tuple[str, ...]:
+    """
+    Tokenize a query and drop stopwords, memoized per query string.
+    
+    Args:
+        query: The user query
+        
+    Returns:
+        Tuple[str, ...]: Extracted keywords
+    """
+    # Get stop words (retry the corpus if it was unavailable at import)
+    stop_words = _STOP_WORDS if _STOP_WORDS is not None else set(stopwords.words('english'))
+    
+    # Tokenize and filter out stopwords
+    return tuple(word for word in _TOKEN_RE.findall(query.lower()) if word not in stop_words)
+
 def extract_keywords(query: str) -> List[str]:
     """
     Extract keywords from a query, removing stopwords.
@@ -84,12 +121,7 @@ def extract_keywords(query: str) -> List[str]:
         List[str]: List of extracted keywords
     """
     try:
-        # Get stop words
-        stop_words = set(stopwords.words('english'))
-        
-        # Tokenize and filter out stopwords
-        word_tokens = word_tokenize(query.lower())
-        keywords = [word for word in word_tokens if word.isalnum() and word not in stop_words]
+        keywords = list(_extract_keywords_cached(query))
         
         logger.debug(f"Extracted keywords: {keywords}")
         return keywords
@@ -98,53 +130,184 @@ def extract_keywords(query: str) -> List[str]:
         # Fallback to simple word splitting
         return [word.lower() for word in query.split() if len(word) > 3]
 
-def match_keywords_to_collections(query: str, meta_index: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+class _MetaIndexKey:
     """
-    Match query keywords to database collections.
+    Hashable identity wrapper so a meta index dict can key an lru_cache.
+    
+    Holding the reference keeps the dict alive while it is cached, so its
+    id() cannot be reused by another meta index.
+    """
+    __slots__ = ("meta_index",)
+    
+    def __init__(self, meta_index: Dict[str, Any]):
+        self.meta_index = meta_index
+    
+    def __hash__(self) -> int:
+        return id(self.meta_index)
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _MetaIndexKey) and other.meta_index is self.meta_index
+
+def build_collection_token_index(meta_index: Dict[str, Any]) -> Mapping[str, Tuple[Tuple[str, str], ...]]:
+    """
+    Build an inverted index from column-name and example tokens to collections.
     
     Args:
-        query: The user query
         meta_index: The loaded meta index
         
     Returns:
-        Tuple[Optional[str], Optional[str]]: Matched database and collection names or (None, None)
+        Mapping[str, Tuple[Tuple[str, str], ...]]: Read-only token to (database, collection) postings
     """
-    try:
-        # Extract keywords from query
-        keywords = extract_keywords(query)
+    postings: Dict[str, Dict[Tuple[str, str], None]] = {}
+    
+    for db_name, db_info in meta_index.items():
+        for collection_name, collection_info in db_info.items():
+            key = (db_name, collection_name)
+            
+            for col_name, col_info in collection_info.get('columns', {}).items():
+                # Tokenize the column name and its examples
+                values = [col_name]
+                examples = col_info.get('examples', [])
+                if isinstance(examples, list):
+                    values.extend(ex for ex in examples if ex)
+                
+                for value in values:
+                    for token in _TOKEN_RE.findall(str(value).lower()):
+                        # Dict keys keep postings unique and in meta index order
+                        postings.setdefault(token, {})[key] = None
+    
+    # Read-only view: the index is shared by all concurrent queries
+    return MappingProxyType({token: tuple(keys) for token, keys in postings.items()})
+
+@functools.lru_cache(maxsize=4)
+def _get_token_index(index_key: _MetaIndexKey) -> Mapping[str, Tuple[Tuple[str, str], ...]]:
+    """
+    Get the token index for a meta index, building it on first use.
+    
+    Args:
+        index_key: Identity key wrapping the loaded meta index
         
-        # Track matching scores for each collection
-        collection_scores = Counter()
+    Returns:
+        Mapping[str, Tuple[Tuple[str, str], ...]]: Token to (database, collection) postings
+    """
+    return build_collection_token_index(index_key.meta_index)
+
+@functools.lru_cache(maxsize=4)
+def _get_token_vocabulary(index_key: _MetaIndexKey) -> Tuple[str, ...]:
+    """
+    Get the sorted token vocabulary of a meta index for prefix lookups.
+    
+    Args:
+        index_key: Identity key wrapping the loaded meta index
         
-        # Iterate through databases and collections
-        for db_name, db_info in meta_index.items():
-            for collection_name, collection_info in db_info.items():
-                # Get column examples
-                column_examples = []
-                for col_name, col_info in collection_info.get('columns', {}).items():
-                    # Add column name
-                    column_examples.append(col_name.lower())
-                    
-                    # Add column examples if available
-                    examples = col_info.get('examples', [])
-                    if isinstance(examples, list):
-                        column_examples.extend([str(ex).lower() for ex in examples if ex])
-                
-                # Check if any keyword matches collection data
-                for keyword in keywords:
-                    if any(keyword.lower() in example.lower() if isinstance(example, str) else False 
-                           for example in column_examples):
-                        collection_scores[(db_name, collection_name)] += 1
+    Returns:
+        Tuple[str, ...]: Sorted tokens of the token index
+    """
+    return tuple(sorted(_get_token_index(index_key)))
+
+@functools.lru_cache(maxsize=4)
+def _get_collection_positions(index_key: _MetaIndexKey) -> Dict[Tuple[str, str], int]:
+    """
+    Get the position of each collection in meta index order.
+    
+    Args:
+        index_key: Identity key wrapping the loaded meta index
         
-        logger.debug(f"Collection scores: {collection_scores}")
+    Returns:
+        Dict[Tuple[str, str], int]: (database, collection) to position
+    """
+    positions: Dict[Tuple[str, str], int] = {}
+    for db_name, db_info in index_key.meta_index.items():
+        for collection_name in db_info:
+            positions[(db_name, collection_name)] = len(positions)
+    return positions
+
+def _keyword_collections(
+    keyword: str,
+    token_index: Mapping[str, Tuple[Tuple[str, str], ...]],
+    vocabulary: Tuple[str, ...]
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the collections containing a token that starts with the keyword.
+    
+    Args:
+        keyword: Query keyword
+        token_index: Token to (database, collection) postings
+        vocabulary: Sorted tokens of the token index
         
-        # Return the best match if any
-        if collection_scores:
-            best_match = collection_scores.most_common(1)[0][0]
-            return best_match
+    Returns:
+        Tuple[Tuple[str, str], ...]: Matching (database, collection) pairs
+    """
+    if len(keyword) < _MIN_PREFIX_LEN:
+        return token_index.get(keyword, ())
+    
+    # Tokens sharing the prefix are contiguous in the sorted vocabulary
+    start = bisect_left(vocabulary, keyword)
+    end = bisect_left(vocabulary, keyword + "\uffff", start)
+    
+    if end - start == 1:
+        return token_index[vocabulary[start]]
+    
+    # Count each collection once per keyword
+    matches: Dict[Tuple[str, str], None] = {}
+    for token in vocabulary[start:end]:
+        matches.update(dict.fromkeys(token_index[token]))
+    return tuple(matches)
+
+@functools.lru_cache(maxsize=4096)
+def _match_keywords_cached(query: str, index_key: _MetaIndexKey) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Score collections against the query keywords, memoized per query and meta index.
+    
+    Args:
+        query: The user query
+        index_key: Identity key wrapping the loaded meta index
         
-        return None, None
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Matched database and collection names or (None, None)
+    """
+    token_index = _get_token_index(index_key)
+    vocabulary = _get_token_vocabulary(index_key)
+    
+    # Extract keywords from query
+    keywords = extract_keywords(query)
+    
+    # Each keyword scores one point for every collection with a token it prefixes
+    collection_scores = Counter()
+    for keyword in keywords:
+        collection_scores.update(_keyword_collections(keyword, token_index, vocabulary))
+    
+    logger.debug(f"Collection scores: {collection_scores}")
+    
+    # Return the best match if any
+    if collection_scores:
+        # Ties resolve to the collection listed first in the meta index
+        positions = _get_collection_positions(index_key)
+        best_match = max(
+            collection_scores,
+            key=lambda key: (collection_scores[key], -positions[key])
+        )
+        return best_match
+    
+    return None, None
+
+def match_keywords_to_collections(query: str, meta_index: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Match query keywords to database collections.
+    
+    Results are cached per query for a given meta index object; the cache is
+    cleared by load_meta_index, so a meta index should not be mutated in place.
+    
+    Args:
+        query: The user query
+        meta_index: The loaded meta index
+        
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Matched database and collection names or (None, None)
+    """
+    try:
+        return _match_keywords_cached(query, _MetaIndexKey(meta_index))
     except Exception as e:
         logger.error(f"❌ Error matching keywords to collections: {e}")
         logger.error(traceback.format_exc())
-        return None, None
\ No newline at end of file
+        return None, None
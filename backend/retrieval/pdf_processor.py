@@ -1,22 +1,52 @@
 import os
 import re
 import io
+import mmap
+import hashlib
 import tempfile
-from typing import List, Dict, Any, Optional, Tuple, Union
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union, AsyncIterator, Callable, Awaitable
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Executor
+from itertools import accumulate
 
+import numpy as np
+import orjson
 import PyPDF2
 import fitz  # PyMuPDF
 import aiofiles
 from pdfminer.high_level import extract_text as pdfminer_extract_text
-from pdfminer.high_level import extract_text_to_fp
 from pdfminer.layout import LAParams
+from pdfminer.converter import TextConverter
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
 
 from backend.utils.logging import setup_logger
+from backend.config import settings
 
 logger = setup_logger("pdf_processor")
 
+# Plain text extraction: keep whitespace, clip to the page, no ligature or
+# image handling
+_PYMUPDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# Pages extracted per task when a large PDF is split across processes
+PDF_PAGES_PER_TASK = 32
+
+# Eviction trims the text cache to this fraction of PDF_TEXT_CACHE_MAX_BYTES,
+# so writes landing just over the cap don't each rescan the directory
+_CACHE_EVICT_TARGET = 0.9
+
+# Running size of the text cache, set by the first scan and corrected by
+# each eviction scan; other processes' writes are picked up on rescan
+_cache_bytes: Optional[int] = None
+_cache_lock = threading.Lock()
+
+# Text cleanup patterns
+_WS_RE = re.compile(r"\s+")
+_PAGENUM_RE = re.compile(r"^\s*\d+\s*$")
+_HEADER_RE = re.compile(r"^.*\s+\d+\s*$")
+
 async def extract_text_from_pdf(
     pdf_path: str,
     extraction_method: str = "pymupdf",
@@ -25,6 +55,268 @@ async def extract_text_from_pdf(
     """
     Extract text from a PDF file using multiple methods
     
+    Args:
+        pdf_path: Path to the PDF file
+        extraction_method: Method to use for extraction ('pymupdf', 'pdfminer', 'pypdf2')
+        fallback: Whether to try other methods if the primary one fails
+        
+    Returns:
+        Tuple of extracted text and page mapping
+    """
+    # Run in the default executor to avoid blocking the event loop
+    async def _extract() -> Tuple[str, Dict[int, int]]:
+        return await asyncio.to_thread(
+            extract_text_from_pdf_sync, pdf_path, extraction_method, fallback
+        )
+    
+    # Results without fallback may differ from the cached ones, so skip the cache
+    if not fallback:
+        return await _extract()
+    
+    return await _with_extraction_cache(pdf_path, extraction_method, _extract)
+
+async def extract_text_from_pdf_parallel(
+    pdf_path: str,
+    executor: Executor,
+    pages_per_task: int = PDF_PAGES_PER_TASK
+) -> Tuple[str, Dict[int, int]]:
+    """
+    Extract text from a PDF, splitting large documents into page ranges
+    
+    PyMuPDF is not thread-safe, so the ranges are meant for a process pool;
+    each task opens the file itself. Small documents, failures and PDFs
+    without a text layer go through extract_text_from_pdf_sync as a whole.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        executor: Process pool to run the extraction in
+        pages_per_task: Number of pages extracted per task
+        
+    Returns:
+        Tuple of extracted text and page mapping
+    """
+    return await _with_extraction_cache(
+        pdf_path,
+        "pymupdf",
+        lambda: _extract_text_from_pdf_parallel(pdf_path, executor, pages_per_task)
+    )
+
+async def _extract_text_from_pdf_parallel(
+    pdf_path: str,
+    executor: Executor,
+    pages_per_task: int
+) -> Tuple[str, Dict[int, int]]:
+    """Uncached body of extract_text_from_pdf_parallel"""
+    loop = asyncio.get_running_loop()
+    
+    try:
+        page_count = await loop.run_in_executor(executor, _pymupdf_page_count, pdf_path)
+    except Exception as e:
+        logger.error(f"Error reading page count with pymupdf: {str(e)}")
+        page_count = 0
+    
+    if page_count >= 2 * pages_per_task:
+        try:
+            ranges = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor, _extract_pages_pymupdf, pdf_path, start,
+                    min(start + pages_per_task, page_count)
+                )
+                for start in range(0, page_count, pages_per_task)
+            ])
+            text_parts = [page_text for page_range in ranges for page_text in page_range]
+            
+            text = "".join(text_parts)
+            if text.strip():
+                return text, _page_map_from_parts(text_parts)
+            
+            logger.warning("No text extracted using pymupdf. Trying alternatives.")
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF: {str(e)}")
+    
+    return await loop.run_in_executor(executor, extract_text_from_pdf_sync, pdf_path)
+
+async def _with_extraction_cache(
+    pdf_path: str,
+    extraction_method: str,
+    extract: Callable[[], Awaitable[Tuple[str, Dict[int, int]]]]
+) -> Tuple[str, Dict[int, int]]:
+    """
+    Return the cached extraction for the PDF's content, or extract and cache it
+    
+    Args:
+        pdf_path: Path to the PDF file
+        extraction_method: Primary extraction method, part of the cache key
+        extract: Coroutine function performing the extraction
+        
+    Returns:
+        Tuple of extracted text and page mapping
+    """
+    if not settings.PDF_TEXT_CACHE_DIR:
+        return await extract()
+    
+    # Hash and read on a worker thread; hashlib releases the GIL
+    cache_key, cached = await asyncio.to_thread(_load_cached_extraction, pdf_path, extraction_method)
+    if cached is not None:
+        return cached
+    
+    text, page_map = await extract()
+    
+    # Only cache successful extractions so failures are retried
+    if cache_key and text.strip():
+        await asyncio.to_thread(_store_cached_extraction, cache_key, text, page_map)
+    
+    return text, page_map
+
+def _load_cached_extraction(
+    pdf_path: str,
+    extraction_method: str
+) -> Tuple[Optional[str], Optional[Tuple[str, Dict[int, int]]]]:
+    """
+    Look up a cached extraction by the PDF's content digest
+    
+    Args:
+        pdf_path: Path to the PDF file
+        extraction_method: Primary extraction method
+        
+    Returns:
+        Tuple of the cache key (None if the file can't be hashed) and the
+        cached text and page mapping (None on a miss)
+    """
+    try:
+        with open(pdf_path, "rb") as pdf_file, \
+                mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_data:
+            digest = hashlib.blake2b(pdf_data, digest_size=16).hexdigest()
+    except (OSError, ValueError):
+        # Missing or empty file; let the extractor report it
+        return None, None
+    
+    cache_key = f"{digest}.{extraction_method}"
+    cache_path = os.path.join(settings.PDF_TEXT_CACHE_DIR, f"{cache_key}.json")
+    
+    try:
+        with open(cache_path, "rb") as f:
+            data = orjson.loads(f.read())
+        # Mark the entry as recently used for eviction
+        os.utime(cache_path)
+    except FileNotFoundError:
+        return cache_key, None
+    except Exception as e:
+        logger.warning(f"Error reading PDF text cache {cache_path}: {str(e)}")
+        return cache_key, None
+    
+    page_map = {pos: page for pos, page in data["pages"]}
+    return cache_key, (data["text"], page_map)
+
+def _store_cached_extraction(cache_key: str, text: str, page_map: Dict[int, int]) -> None:
+    """
+    Write an extraction to the PDF text cache
+    
+    Args:
+        cache_key: Key returned by _load_cached_extraction
+        text: Extracted text
+        page_map: Page mapping
+    """
+    cache_path = os.path.join(settings.PDF_TEXT_CACHE_DIR, f"{cache_key}.json")
+    temp_path = None
+    
+    try:
+        os.makedirs(settings.PDF_TEXT_CACHE_DIR, exist_ok=True)
+        
+        # Unique temp file, so threads writing the same key don't collide
+        data = orjson.dumps({"text": text, "pages": list(page_map.items())})
+        fd, temp_path = tempfile.mkstemp(dir=settings.PDF_TEXT_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        
+        try:
+            replaced = os.stat(cache_path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(temp_path, cache_path)
+        temp_path = None
+        _track_cached_bytes(len(data) - replaced)
+    except Exception as e:
+        logger.warning(f"Error writing PDF text cache {cache_path}: {str(e)}")
+    finally:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+def _track_cached_bytes(delta: int) -> None:
+    """
+    Add a write to the running cache size, evicting once it exceeds the cap
+    
+    Args:
+        delta: Bytes added to the cache directory
+    """
+    global _cache_bytes
+    
+    with _cache_lock:
+        if _cache_bytes is None:
+            # First write in this process: one scan to learn the current size
+            _cache_bytes = _evict_cached_extractions(settings.PDF_TEXT_CACHE_MAX_BYTES)
+        else:
+            _cache_bytes += delta
+            if _cache_bytes > settings.PDF_TEXT_CACHE_MAX_BYTES:
+                _cache_bytes = _evict_cached_extractions(
+                    int(settings.PDF_TEXT_CACHE_MAX_BYTES * _CACHE_EVICT_TARGET)
+                )
+
+def _evict_cached_extractions(limit: int) -> Optional[int]:
+    """
+    Delete the least recently used cache entries beyond a size limit
+    
+    Args:
+        limit: Size in bytes to trim the cache to
+        
+    Returns:
+        Remaining cache size in bytes, or None if the directory can't be scanned
+    """
+    entries = []
+    total = 0
+    
+    try:
+        with os.scandir(settings.PDF_TEXT_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except OSError as e:
+        logger.warning(f"Error scanning PDF text cache: {str(e)}")
+        return None
+    
+    if total <= limit:
+        return total
+    
+    # Oldest access first
+    entries.sort()
+    for _, size, path in entries:
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    
+    return total
+
+def extract_text_from_pdf_sync(
+    pdf_path: str,
+    extraction_method: str = "pymupdf",
+    fallback: bool = True
+) -> Tuple[str, Dict[int, int]]:
+    """
+    Synchronous version of extract_text_from_pdf
+    
+    Module-level so it can be submitted to a process pool.
+    
     Args:
         pdf_path: Path to the PDF file
         extraction_method: Method to use for extraction ('pymupdf', 'pdfminer', 'pypdf2')
@@ -46,7 +338,7 @@ async def extract_text_from_pdf(
     try:
         # Use the specified method
         extract_func = methods[extraction_method]
-        text, page_map = await extract_func(pdf_path)
+        text, page_map = extract_func(pdf_path)
         
         # Check if extraction was successful
         if not text.strip() and fallback:
@@ -56,7 +348,7 @@ async def extract_text_from_pdf(
             for method_name, method_func in methods.items():
                 if method_name != extraction_method:
                     try:
-                        alt_text, alt_page_map = await method_func(pdf_path)
+                        alt_text, alt_page_map = method_func(pdf_path)
                         if alt_text.strip():
                             logger.info(f"Successfully extracted text using {method_name}.")
                             return alt_text, alt_page_map
@@ -75,7 +367,7 @@ async def extract_text_from_pdf(
             for method_name, method_func in methods.items():
                 if method_name != extraction_method:
                     try:
-                        text, page_map = await method_func(pdf_path)
+                        text, page_map = method_func(pdf_path)
                         if text.strip():
                             logger.info(f"Successfully extracted text using {method_name}.")
                             return text, page_map
@@ -85,123 +377,148 @@ async def extract_text_from_pdf(
         # If all methods fail, return empty results
         return "", {}
 
-async def _extract_text_pymupdf(pdf_path: str) -> Tuple[str, Dict[int, int]]:
+def _extract_text_pymupdf(pdf_path: str) -> Tuple[str, Dict[int, int]]:
     """Extract text using PyMuPDF (fitz)"""
-    def _extract():
-        text_parts = []
-        page_map = {}
-        current_pos = 0
-        
-        with fitz.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf):
-                # Extract text from page
-                page_text = page.get_text()
-                
-                # Map start position to page number
-                page_map[current_pos] = page_num + 1
-                
-                # Update position and add text
-                current_pos += len(page_text)
-                text_parts.append(page_text)
+    with fitz.open(pdf_path) as pdf:
+        text_parts = [""] * pdf.page_count
         
-        return "".join(text_parts), page_map
+        for page_num, page in enumerate(pdf):
+            # Extract text from page
+            text_parts[page_num] = page.get_text("text", flags=_PYMUPDF_TEXT_FLAGS)
     
-    # Run in a thread pool to avoid blocking the event loop
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, _extract)
+    return "".join(text_parts), _page_map_from_parts(text_parts)
 
-async def _extract_text_pdfminer(pdf_path: str) -> Tuple[str, Dict[int, int]]:
+def _pymupdf_page_count(pdf_path: str) -> int:
+    """Count the pages of a PDF using PyMuPDF (fitz)"""
+    with fitz.open(pdf_path) as pdf:
+        return pdf.page_count
+
+def _extract_pages_pymupdf(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) using PyMuPDF (fitz)"""
+    with fitz.open(pdf_path) as pdf:
+        return [
+            pdf[page_num].get_text("text", flags=_PYMUPDF_TEXT_FLAGS)
+            for page_num in range(start, stop)
+        ]
+
+def _page_map_from_parts(text_parts: List[str]) -> Dict[int, int]:
+    """Map the start position of each page's text to its page number"""
+    page_starts = accumulate((len(page_text) for page_text in text_parts), initial=0)
+    return dict(zip(page_starts, range(1, len(text_parts) + 1)))
+
+def _extract_text_pdfminer(pdf_path: str) -> Tuple[str, Dict[int, int]]:
     """Extract text using PDFMiner"""
-    def _extract():
-        output_string = io.StringIO()
-        page_map = {}
-        current_pos = 0
+    output_string = io.StringIO()
+    page_map = {}
+    laparams = LAParams(
+        line_margin=0.5,
+        char_margin=2.0,
+        word_margin=0.1
+    )
+    
+    with open(pdf_path, "rb") as pdf_file:
+        # Parse the document once and interpret it page by page
+        resource_manager = PDFResourceManager()
+        device = TextConverter(resource_manager, output_string, laparams=laparams)
+        interpreter = PDFPageInterpreter(resource_manager, device)
         
-        with open(pdf_path, "rb") as pdf_file:
-            # Extract text page by page
-            for page_num, page in enumerate(PyPDF2.PdfReader(pdf_file).pages):
-                # Create a temporary file for this page
-                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-                    temp_path = temp_file.name
-                
-                    # Create a new PDF with just this page
-                    writer = PyPDF2.PdfWriter()
-                    writer.add_page(page)
-                    writer.write(temp_file)
-                
-                # Extract text from the page using PDFMiner
-                with open(temp_path, "rb") as page_file:
-                    page_output = io.StringIO()
-                    laparams = LAParams(
-                        line_margin=0.5,
-                        char_margin=2.0,
-                        word_margin=0.1
-                    )
-                    extract_text_to_fp(page_file, page_output, laparams=laparams)
-                    page_text = page_output.getvalue()
-                
+        try:
+            for page_num, page in enumerate(PDFPage.get_pages(pdf_file)):
                 # Map start position to page number
-                page_map[current_pos] = page_num + 1
-                
-                # Update position and add text
-                current_pos += len(page_text)
-                output_string.write(page_text)
-                
-                # Remove temporary file
-                os.unlink(temp_path)
-        
-        return output_string.getvalue(), page_map
+                page_map[output_string.tell()] = page_num + 1
+                interpreter.process_page(page)
+        finally:
+            device.close()
     
-    # Run in a thread pool to avoid blocking the event loop
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, _extract)
+    return output_string.getvalue(), page_map
 
-async def _extract_text_pypdf2(pdf_path: str) -> Tuple[str, Dict[int, int]]:
+def _extract_text_pypdf2(pdf_path: str) -> Tuple[str, Dict[int, int]]:
     """Extract text using PyPDF2"""
-    def _extract():
-        text_parts = []
-        page_map = {}
-        current_pos = 0
+    text_parts = []
+    page_map = {}
+    current_pos = 0
+    
+    # Read through a read-only mapping so the page cache is the only copy
+    with open(pdf_path, "rb") as pdf_file, \
+            mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_data:
+        pdf_reader = PyPDF2.PdfReader(pdf_data)
         
-        with open(pdf_path, "rb") as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+        for page_num in range(len(pdf_reader.pages)):
+            # Extract text from page
+            page = pdf_reader.pages[page_num]
+            page_text = page.extract_text() or ""
             
-            for page_num in range(len(pdf_reader.pages)):
-                # Extract text from page
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text() or ""
-                
-                # Clean up text
-                page_text = re.sub(r"\s+", " ", page_text)
-                page_text = page_text.strip()
-                
-                # Add newline if text doesn't end with one
-                if page_text and not page_text.endswith("\n"):
-                    page_text += "\n"
-                
-                # Map start position to page number
-                page_map[current_pos] = page_num + 1
-                
-                # Update position and add text
-                current_pos += len(page_text)
-                text_parts.append(page_text)
+            # Clean up text (per page, since page_map offsets depend on it)
+            page_text = _WS_RE.sub(" ", page_text)
+            page_text = page_text.strip()
+            
+            # Add newline if text doesn't end with one
+            if page_text and not page_text.endswith("\n"):
+                page_text += "\n"
+            
+            # Map start position to page number
+            page_map[current_pos] = page_num + 1
+            
+            # Update position (plus the separator newline) and add text
+            current_pos += len(page_text) + 1
+            text_parts.append(page_text)
+    
+    return "\n".join(text_parts), page_map
+
+def _find_chunk_end(text: str, start: int, chunk_size: int) -> int:
+    """
+    Find where a chunk starting at start should end
+    
+    Prefers a paragraph break, then a sentence break, then a word break in
+    the second half of the window; otherwise cuts at chunk_size.
+    
+    Args:
+        text: Text being split
+        start: Start offset of the chunk
+        chunk_size: Maximum size of the chunk
         
-        return "\n".join(text_parts), page_map
+    Returns:
+        End offset of the chunk
+    """
+    end = start + chunk_size
+    min_break = start + chunk_size // 2
+    
+    # Breaks at or before min_break are never used, so only the second half
+    # of the window is scanned
+    lo = min_break + 1
+    
+    # Look for paragraph break
+    paragraph_break = text.rfind("\n\n", lo, end)
+    if paragraph_break != -1:
+        return paragraph_break + 2  # Include the double newline
+    
+    # Look for sentence break (period followed by space or newline)
+    sentence_break = max(
+        text.rfind(". ", lo, end),
+        text.rfind(".\n", lo, end),
+        text.rfind("! ", lo, end),
+        text.rfind("!\n", lo, end),
+        text.rfind("? ", lo, end),
+        text.rfind("?\n", lo, end)
+    )
+    
+    if sentence_break != -1:
+        return sentence_break + 2  # Include the period and space
     
-    # Run in a thread pool to avoid blocking the event loop
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, _extract)
+    # Look for word break
+    space = text.rfind(" ", lo, end)
+    if space != -1:
+        return space + 1  # Include the space
+    
+    return end
 
-def split_text_into_chunks(
+def split_text_into_chunk_offsets(
     text: str,
     chunk_size: int = 1000,
     chunk_overlap: int = 200
-) -> List[str]:
+) -> np.ndarray:
     """
-    Split text into chunks with overlap
+    Compute chunk boundaries as character offsets into the text
     
     Args:
         text: Text to split
@@ -209,57 +526,103 @@ def split_text_into_chunks(
         chunk_overlap: Overlap between chunks
         
     Returns:
-        List of text chunks
+        Array of shape (N, 2) with the start and end offset of each chunk
     """
+    text_len = len(text)
+    
     # If text is shorter than chunk size, return as a single chunk
-    if len(text) <= chunk_size:
-        return [text]
+    if text_len <= chunk_size:
+        return np.array([[0, text_len]], dtype=np.int64)
     
     # Split text into chunks
-    chunks = []
+    offsets = []
     start = 0
     
-    while start < len(text):
-        # Get chunk with potential overlap
-        end = start + chunk_size
-        
+    while start < text_len:
         # If we're at the end of the text, just use the remainder
-        if end >= len(text):
-            chunks.append(text[start:])
+        if start + chunk_size >= text_len:
+            offsets.append((start, text_len))
             break
         
         # Try to find a suitable breakpoint (paragraph, sentence, or word)
+        end = _find_chunk_end(text, start, chunk_size)
         
-        # Look for paragraph break
-        paragraph_break = text.rfind("\n\n", start, end)
-        if paragraph_break != -1 and paragraph_break > start + chunk_size // 2:
-            end = paragraph_break + 2  # Include the double newline
-        else:
-            # Look for sentence break (period followed by space or newline)
-            sentence_break = max(
-                text.rfind(". ", start, end),
-                text.rfind(".\n", start, end),
-                text.rfind("! ", start, end),
-                text.rfind("!\n", start, end),
-                text.rfind("? ", start, end),
-                text.rfind("?\n", start, end)
-            )
+        # Add chunk
+        offsets.append((start, end))
+        
+        # Move start position for next chunk, accounting for overlap
+        start = end - chunk_overlap
+    
+    return np.array(offsets, dtype=np.int64)
+
+async def stream_text_chunks(
+    blocks: AsyncIterator[str],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> AsyncIterator[str]:
+    """
+    Split a stream of text blocks into chunks with overlap
+    
+    Produces the same chunks as split_text_into_chunks on the concatenated
+    text while only holding about one block plus one chunk in memory.
+    
+    Args:
+        blocks: Async iterator of consecutive text blocks
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Overlap between chunks
+        
+    Yields:
+        Text chunks
+    """
+    buf = ""
+    start = 0
+    eof = False
+    
+    while True:
+        # Make sure a full window (plus one character) is buffered
+        while not eof and len(buf) - start <= chunk_size:
+            try:
+                block = await blocks.__anext__()
+            except StopAsyncIteration:
+                eof = True
+                break
             
-            if sentence_break != -1 and sentence_break > start + chunk_size // 2:
-                end = sentence_break + 2  # Include the period and space
-            else:
-                # Look for word break
-                space = text.rfind(" ", start, end)
-                if space != -1 and space > start + chunk_size // 2:
-                    end = space + 1  # Include the space
+            # Drop consumed text before appending the next block
+            buf = buf[start:] + block
+            start = 0
         
-        # Add chunk
-        chunks.append(text[start:end])
+        if start >= len(buf):
+            break
+        
+        # If we're at the end of the text, just use the remainder
+        if start + chunk_size >= len(buf):
+            yield buf[start:]
+            break
+        
+        end = _find_chunk_end(buf, start, chunk_size)
+        yield buf[start:end]
         
         # Move start position for next chunk, accounting for overlap
         start = end - chunk_overlap
+
+def split_text_into_chunks(
+    text: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> List[str]:
+    """
+    Split text into chunks with overlap
     
-    return chunks
+    Args:
+        text: Text to split
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        List of text chunks
+    """
+    offsets = split_text_into_chunk_offsets(text, chunk_size, chunk_overlap)
+    return [text[start:end] for start, end in offsets.tolist()]
 
 def clean_pdf_text(text: str) -> str:
     """
@@ -271,34 +634,18 @@ def clean_pdf_text(text: str) -> str:
     Returns:
         Cleaned text
     """
-    # Replace multiple spaces with a single space
-    text = re.sub(r"\s+", " ", text)
+    # Replace runs of whitespace (newlines included) with a single space
+    text = _WS_RE.sub(" ", text)
     
     # Fix common OCR errors
-    text = text.replace("l/", "U")
-    text = text.replace("lJ", "U")
-    text = text.replace("ll", "ll")
-    
-    # Remove header/footer artifacts (page numbers, etc.)
-    # This is a simplified approach; a more robust solution would use pattern matching
-    lines = text.split("\n")
-    cleaned_lines = []
-    
-    for line in lines:
-        # Skip page number lines
-        if re.match(r"^\s*\d+\s*$", line):
-            continue
-        
-        # Skip header/footer with page numbers
-        if re.match(r"^.*\s+\d+\s*$", line) and len(line) < 30:
-            continue
-        
-        cleaned_lines.append(line)
+    text = text.replace("l/", "U").replace("lJ", "U")
     
-    text = "\n".join(cleaned_lines)
+    # With newlines collapsed the text is a single line, so the line-based
+    # header/footer filter reduces to checking the whole text
+    if _PAGENUM_RE.match(text):
+        return ""
     
-    # Fix paragraph boundaries
-    text = re.sub(r"(?<!\n)\n(?!\n)", " ", text)  # Single newlines to spaces
-    text = re.sub(r"\n{3,}", "\n\n", text)  # Multiple newlines to double newlines
+    if len(text) < 30 and _HEADER_RE.match(text):
+        return ""
     
-    return text.strip()
\ No newline at end of file
+    return text.strip()
@@ -1,18 +1,365 @@
 import os
+import re
 import time
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple, Union
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union, Set, FrozenSet
 import numpy as np
 from datetime import datetime
 
-from backend.db.chromadb_client import get_chroma_client
+from backend.db.chromadb_client import get_cached_collection, invalidate_collection
 from backend.utils.cache import get_cache, set_cache
+from backend.utils.cache_codec import encode, decode
+from backend.retrieval.reranker import cross_encoder_scores
+from backend.retrieval.bm25_index import get_bm25_index
 from backend.utils.logging import setup_logger
 from backend.config import settings
 from backend.models.model_loader import model_loader
 
 logger = setup_logger("rag_pipeline")
 
+# Acronyms and abbreviations expanded in queries
+_QUERY_EXPANSIONS = {
+    "roi": "return on investment",
+    "pv": "photovoltaic",
+    "solar pv": "solar photovoltaic",
+    "kwh": "kilowatt hour",
+    "kw": "kilowatt",
+    "mw": "megawatt",
+    "ac": "alternating current",
+    "dc": "direct current"
+}
+
+# Whole-word alternation, longest first so "solar pv" wins over "pv"
+_QUERY_EXPANSION_RE = re.compile(
+    r"\b(" + "|".join(
+        re.escape(abbr) for abbr in sorted(_QUERY_EXPANSIONS, key=len, reverse=True)
+    ) + r")\b"
+)
+
+# Query embedding micro-batching: concurrent cache misses are collected for
+# up to QUERY_EMBED_WINDOW seconds (or QUERY_EMBED_BATCH queries) and encoded
+# in a single call
+QUERY_EMBED_BATCH = 32
+QUERY_EMBED_WINDOW = 0.005
+QUERY_EMBED_CACHE_SIZE = 1024
+
+class _QueryEmbedder:
+    """
+    Embeds queries through an LRU cache, coalescing concurrent misses
+    into batched encode calls
+    """
+    
+    def __init__(
+        self,
+        cache_size: int = QUERY_EMBED_CACHE_SIZE,
+        max_batch: int = QUERY_EMBED_BATCH,
+        window: float = QUERY_EMBED_WINDOW
+    ):
+        self.cache_size = cache_size
+        self.max_batch = max_batch
+        self.window = window
+        self.hits = 0
+        self.misses = 0
+        self._model = None
+        self._cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def embed(self, model: Any, query: str) -> List[float]:
+        """
+        Get the embedding of a query
+        
+        Args:
+            model: Embedding model; the cache is cleared when it changes
+            query: User query
+            
+        Returns:
+            Query embedding
+        """
+        if model is not self._model:
+            self._cache.clear()
+            self._model = model
+        
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            self.hits += 1
+            return list(cached)
+        
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        
+        # The queue and worker belong to the loop that created them
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((model, query, future))
+        embedding = await future
+        
+        if model is self._model:
+            self._cache[query] = embedding
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        return list(embedding)
+    
+    async def _run(self) -> None:
+        """Drain the queue in batches for the lifetime of the event loop"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._encode_batch(batch)
+    
+    async def _encode_batch(self, batch: List[Tuple[Any, str, asyncio.Future]]) -> None:
+        """Encode a batch of queued queries and resolve their futures"""
+        # A model swap can land mid-batch, so encode per model
+        by_model: Dict[Any, List[Tuple[str, asyncio.Future]]] = {}
+        for model, query, future in batch:
+            by_model.setdefault(model, []).append((query, future))
+        
+        for model, items in by_model.items():
+            queries = list(dict.fromkeys(query for query, _ in items))
+            
+            try:
+                # Normalized like the document embeddings at ingestion, so
+                # distances and similarity thresholds are on the same scale
+                vectors = await asyncio.to_thread(
+                    model.encode,
+                    queries,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+                results = dict(zip(queries, (tuple(v) for v in vectors.tolist())))
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # Skip futures whose callers were cancelled meanwhile
+            for query, future in items:
+                if not future.done():
+                    future.set_result(results[query])
+
+_query_embedder = _QueryEmbedder()
+
+# Semantic result caching: a query whose embedding is this close (cosine) to
+# a recent query with the same retrieval parameters reuses its chunks
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+class _SemanticChunkCache:
+    """
+    Ring buffer of recent query embeddings mapped to their chunk cache keys
+    """
+    
+    def __init__(
+        self,
+        size: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD
+    ):
+        self.size = size
+        self.threshold = threshold
+        self._model = None
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes = np.zeros(size, dtype=np.int64)
+        self._keys: List[Optional[str]] = [None] * size
+        self._next = 0
+    
+    def _normalize(self, model: Any, embedding: List[float]) -> Optional[np.ndarray]:
+        """Unit-normalize an embedding, resetting the buffer on a model change"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        
+        if (
+            model is not self._model
+            or self._vectors is None
+            or self._vectors.shape[1] != vector.shape[0]
+        ):
+            self._model = model
+            self._vectors = np.zeros((self.size, vector.shape[0]), dtype=np.float32)
+            self._keys = [None] * self.size
+            self._next = 0
+        
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def lookup(self, model: Any, scope: Tuple[Any, ...], embedding: List[float]) -> Optional[str]:
+        """
+        Find the cache key of a near-identical recent query
+        
+        Args:
+            model: Embedding model that produced the embedding
+            scope: Retrieval parameters the cached chunks must share
+            embedding: Query embedding
+            
+        Returns:
+            Cache key of the closest match, or None
+        """
+        vector = self._normalize(model, embedding)
+        if vector is None:
+            return None
+        
+        candidates = np.flatnonzero(self._scopes == hash(scope))
+        if candidates.size == 0:
+            return None
+        
+        sims = self._vectors[candidates] @ vector
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        
+        return self._keys[candidates[best]]
+    
+    def add(self, model: Any, scope: Tuple[Any, ...], embedding: List[float], key: str) -> None:
+        """
+        Remember the cache key of a query, evicting the oldest entry when full
+        
+        Args:
+            model: Embedding model that produced the embedding
+            scope: Retrieval parameters of the cached chunks
+            embedding: Query embedding
+            key: Cache key the chunks are stored under
+        """
+        vector = self._normalize(model, embedding)
+        if vector is None:
+            return
+        
+        slot = self._next
+        self._vectors[slot] = vector
+        self._scopes[slot] = hash(scope)
+        self._keys[slot] = key
+        self._next = (slot + 1) % self.size
+
+_semantic_cache = _SemanticChunkCache()
+
+# Bounds the worker threads running blocking Chroma calls, per event loop
+_chroma_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+async def _chroma_call(func: Any, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking Chroma call in a worker thread
+    
+    Args:
+        func: Collection method to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Result of the call
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _chroma_semaphores.get(loop)
+    if semaphore is None:
+        # Forget semaphores of loops that have since been closed
+        for closed in [l for l in _chroma_semaphores if l.is_closed()]:
+            del _chroma_semaphores[closed]
+        semaphore = asyncio.Semaphore(max(1, settings.CHROMA_MAX_CONCURRENCY))
+        _chroma_semaphores[loop] = semaphore
+    
+    await semaphore.acquire()
+    try:
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    except BaseException:
+        semaphore.release()
+        raise
+    
+    def _release(done: asyncio.Future) -> None:
+        semaphore.release()
+        # Retrieve the outcome so a cancelled caller's error isn't reported
+        if not done.cancelled():
+            done.exception()
+    
+    # Cancelling the caller can't stop the worker thread, so the slot is held
+    # until the thread finishes rather than until the caller gives up
+    future.add_done_callback(_release)
+    return await asyncio.shield(future)
+
+# The keyword fallback is started alongside the vector search only for
+# collections where recent vector searches often came up short; the rate is
+# an exponential moving average per collection
+FALLBACK_SPECULATION_RATE = 0.5
+FALLBACK_RATE_DECAY = 0.9
+_fallback_rates: Dict[str, float] = {}
+
+# Seconds a collection's document count is reused before Chroma is asked again
+COLLECTION_COUNT_TTL = 30
+
+async def _collection_count(collection_name: str, collection: Any) -> int:
+    """
+    Get the number of documents in a collection, cached briefly
+    
+    Args:
+        collection_name: Name of the vector database collection
+        collection: Chroma collection
+        
+    Returns:
+        Number of documents
+    """
+    cache_key = f"collection_count:{collection_name}"
+    count = get_cache(cache_key)
+    
+    if count is None:
+        count = await _chroma_call(collection.count)
+        set_cache(cache_key, count, expiry=COLLECTION_COUNT_TTL)
+    
+    return count
+
+def query_keywords_of(query: str) -> FrozenSet[str]:
+    """
+    Get the lowercased keywords of a query
+    
+    Args:
+        query: User query
+        
+    Returns:
+        Set of keywords
+    """
+    return frozenset(query.lower().split())
+
+def _chunk_cache_key(
+    query: str,
+    collection_name: str,
+    max_chunks: int,
+    similarity_threshold: float
+) -> str:
+    """
+    Build the cache key for retrieved chunks
+    
+    The parameters are hashed so keys stay short and uniform whatever the
+    length or characters of the query.
+    
+    Args:
+        query: User query
+        collection_name: Name of the vector database collection
+        max_chunks: Maximum number of chunks to retrieve
+        similarity_threshold: Minimum similarity score for chunks
+        
+    Returns:
+        Cache key
+    """
+    raw = f"{query}|{collection_name}|{max_chunks}|{similarity_threshold}"
+    digest = hashlib.blake2b(raw.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    return f"query_chunks:{digest}"
+
 async def retrieve_relevant_chunks(
     query: str,
     collection_name: str,
@@ -35,35 +382,64 @@ async def retrieve_relevant_chunks(
     """
     start_time = time.time()
     
+    cache_key = None
+    
     # Check cache if enabled
     if use_cache:
-        cache_key = f"query_chunks:{query}:{collection_name}:{max_chunks}:{similarity_threshold}"
+        # Built once and reused when storing the results
+        cache_key = _chunk_cache_key(query, collection_name, max_chunks, similarity_threshold)
         cached_results = get_cache(cache_key)
         
         if cached_results:
             logger.info(f"Using cached chunks for query: {query}")
-            return cached_results
+            return decode(cached_results)
+    
+    semantic_task = None
     
     try:
         # Get embeddings model
         model_dict = model_loader.get_embedding_model()
         embedding_function = model_dict["model"].encode
         
-        # Get vector database client
-        chroma_client = get_chroma_client()
-        collection = chroma_client.get_collection(
-            name=collection_name,
-            embedding_function=embedding_function
+        # Get the collection handle (cached across queries)
+        collection = get_cached_collection(collection_name, embedding_function)
+        
+        # Nothing to retrieve, so skip embedding the query
+        if await _collection_count(collection_name, collection) == 0:
+            logger.info(f"Collection {collection_name} is empty")
+            return []
+        
+        # Generate query embedding (cached per query string)
+        query_embedding = await _query_embedder.embed(model_dict["model"], query)
+        logger.debug(
+            f"Query embedding cache: hits={_query_embedder.hits}, misses={_query_embedder.misses}"
         )
         
-        # Generate query embedding
-        query_embedding = embedding_function([query])[0].tolist()
+        # Fall back to the chunks of a near-identical recent query
+        cache_scope = (collection_name, max_chunks, similarity_threshold)
+        if use_cache:
+            similar_key = _semantic_cache.lookup(model_dict["model"], cache_scope, query_embedding)
+            cached_results = get_cache(similar_key) if similar_key else None
+            
+            if cached_results:
+                logger.info(f"Using cached chunks of a similar query for: {query}")
+                return decode(cached_results)
+        
+        # Where the keyword fallback is usually needed, start it now so it
+        # overlaps the vector search; it is discarded if the vector search
+        # finds enough chunks
+        query_keywords = query_keywords_of(query)
+        if _fallback_rates.get(collection_name, 0.0) >= FALLBACK_SPECULATION_RATE:
+            semantic_task = asyncio.create_task(
+                semantic_search(query, collection_name, max_chunks, query_keywords)
+            )
         
         # Retrieve chunks using vector similarity search
         # This is a two-stage retrieval process:
         # 1. First, retrieve more chunks than needed (2x) to ensure good coverage
         # 2. Then, re-rank them using a more sophisticated approach
-        initial_results = collection.query(
+        initial_results = await _chroma_call(
+            collection.query,
             query_embeddings=[query_embedding],
             n_results=max_chunks * 2,
             include=["documents", "metadatas", "distances"]
@@ -82,23 +458,37 @@ async def retrieve_relevant_chunks(
             
             # Normalize distances to similarity scores (1 is most similar)
             # ChromaDB returns L2 distances, so we need to convert
-            max_distance = max(distances) if distances else 1
-            similarities = [1 - (dist / max_distance) for dist in distances]
+            distance_arr = np.asarray(distances, dtype=np.float64)
+            max_distance = distance_arr.max() if distance_arr.size else 0.0
+            similarities = 1.0 - distance_arr / (max_distance or 1.0)
             
-            # Combine results
-            for i, (doc, meta, sim) in enumerate(zip(documents, metadatas, similarities)):
-                if sim >= similarity_threshold:
-                    chunks.append({
-                        "text": doc,
-                        "metadata": meta,
-                        "similarity": sim,
-                        "rank": i + 1
-                    })
+            # Combine results above the threshold
+            keep = np.flatnonzero(similarities >= similarity_threshold).tolist()
+            chunks = [
+                {
+                    "text": documents[i],
+                    "metadata": metadatas[i],
+                    "similarity": float(similarities[i]),
+                    "rank": i + 1,
+                    "_lower": documents[i].lower()
+                }
+                for i in keep
+            ]
         
-        # If we didn't get any results or not enough results, try semantic search
-        if len(chunks) < max_chunks:
+        needs_fallback = len(chunks) < max_chunks
+        _fallback_rates[collection_name] = (
+            FALLBACK_RATE_DECAY * _fallback_rates.get(collection_name, 0.0)
+            + (1 - FALLBACK_RATE_DECAY) * needs_fallback
+        )
+        
+        # If we didn't get any results or not enough results, use semantic search
+        if needs_fallback:
             logger.info(f"Not enough chunks from vector search, trying semantic search")
-            semantic_results = await semantic_search(query, collection_name, max_chunks)
+            if semantic_task is None:
+                semantic_task = asyncio.create_task(
+                    semantic_search(query, collection_name, max_chunks, query_keywords)
+                )
+            semantic_results = await semantic_task
             
             # Add semantic results if they're not already in chunks
             existing_texts = {chunk["text"] for chunk in chunks}
@@ -108,24 +498,37 @@ async def retrieve_relevant_chunks(
                     existing_texts.add(result["text"])
         
         # Re-rank chunks using more sophisticated approach
-        ranked_chunks = await rerank_chunks(query, chunks, max_chunks)
+        ranked_chunks = await rerank_chunks(query, chunks, max_chunks, query_keywords)
+        
+        # Lowercased text is only needed while scoring
+        for chunk in ranked_chunks:
+            chunk.pop("_lower", None)
         
         # Cache results
         if use_cache and ranked_chunks:
-            cache_key = f"query_chunks:{query}:{collection_name}:{max_chunks}:{similarity_threshold}"
-            set_cache(cache_key, ranked_chunks, expiry=300)  # 5 minutes
+            # Stored as compressed msgpack to keep the chunk text small
+            set_cache(cache_key, encode(ranked_chunks), expiry=300)  # 5 minutes
+            _semantic_cache.add(model_dict["model"], cache_scope, query_embedding, cache_key)
         
         logger.info(f"Retrieved {len(ranked_chunks)} chunks in {time.time() - start_time:.2f}s")
         return ranked_chunks
         
     except Exception as e:
         logger.error(f"Error retrieving chunks: {str(e)}")
+        # The cached handle may be stale (e.g. collection recreated)
+        invalidate_collection(collection_name)
         return []
+    
+    finally:
+        # Drop the speculative search if its result wasn't needed
+        if semantic_task is not None and not semantic_task.done():
+            semantic_task.cancel()
 
 async def semantic_search(
     query: str,
     collection_name: str,
-    max_results: int = 5
+    max_results: int = 5,
+    query_keywords: Optional[FrozenSet[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Perform a semantic search on document chunks
@@ -134,32 +537,69 @@ async def semantic_search(
         query: User query
         collection_name: Name of the vector database collection
         max_results: Maximum number of results to return
+        query_keywords: Keywords of the query, computed if not given
         
     Returns:
         List of relevant chunks with metadata
     """
     try:
-        # Get vector database client
-        chroma_client = get_chroma_client()
-        collection = chroma_client.get_collection(name=collection_name)
+        # Get the collection handle (cached across queries)
+        collection = get_cached_collection(collection_name)
         
         # Get total documents to search
-        collection_count = collection.count()
+        collection_count = await _collection_count(collection_name, collection)
         if collection_count == 0:
             return []
         
-        # For smaller collections, get all documents
-        if collection_count <= 1000:
-            all_results = collection.get(
+        # Use the BM25 index when enabled; it scales past the keyword scan
+        # below
+        index = await _chroma_call(get_bm25_index, collection_name, collection, collection_count)
+        if index is not None:
+            hits = await asyncio.to_thread(index.search, query, max_results)
+            if not hits:
+                return []
+            
+            # The index keeps only ids; fetch the matching chunks
+            found = await _chroma_call(
+                collection.get,
+                ids=[chunk_id for chunk_id, _ in hits],
                 include=["documents", "metadatas"]
             )
+            by_id = {
+                chunk_id: (doc, meta)
+                for chunk_id, doc, meta in zip(found["ids"], found["documents"], found["metadatas"])
+            }
+            top_score = hits[0][1]
             
-            documents = all_results["documents"]
-            metadatas = all_results["metadatas"]
+            results = []
+            for chunk_id, score in hits:
+                if chunk_id not in by_id:
+                    # Deleted since the index was built
+                    continue
+                doc, meta = by_id[chunk_id]
+                results.append({
+                    "text": doc,
+                    "metadata": meta,
+                    # Scaled to 0-1 so it mixes with vector similarities
+                    "similarity": score / top_score,
+                    "rank": len(results) + 1,
+                    "_lower": doc.lower()
+                })
             
+            return results
+        
+        # For smaller collections, get the candidate documents
+        if collection_count <= 1000:
             # Simple keyword matching for now
             # In a production system, this would use a more sophisticated approach
-            query_keywords = set(query.lower().split())
+            if query_keywords is None:
+                query_keywords = query_keywords_of(query)
+            
+            all_results = await _get_keyword_candidates(collection, query_keywords)
+            
+            documents = all_results["documents"]
+            metadatas = all_results["metadatas"]
+            
             scored_results = []
             
             for i, (doc, meta) in enumerate(zip(documents, metadatas)):
@@ -172,7 +612,8 @@ async def semantic_search(
                         "text": doc,
                         "metadata": meta,
                         "similarity": similarity,
-                        "rank": len(scored_results) + 1
+                        "rank": len(scored_results) + 1,
+                        "_lower": doc_text
                     })
             
             # Sort by similarity (highest first)
@@ -189,12 +630,44 @@ async def semantic_search(
             
     except Exception as e:
         logger.error(f"Error in semantic search: {str(e)}")
+        # The cached handle may be stale (e.g. collection recreated)
+        invalidate_collection(collection_name)
         return []
 
+async def _get_keyword_candidates(collection: Any, query_keywords: FrozenSet[str]) -> Dict[str, Any]:
+    """
+    Get the documents that may contain any of the query keywords
+    
+    The keywords are pushed down to Chroma as a where_document filter, which
+    its full-text index (trigram, case-insensitive) answers without sending
+    the whole collection back. Keywords under three characters can't be
+    matched by the trigram index, so their presence means a full scan.
+    
+    Args:
+        collection: Chroma collection
+        query_keywords: Lowercased query keywords
+        
+    Returns:
+        Chroma get() result with documents and metadatas
+    """
+    include = ["documents", "metadatas"]
+    
+    if query_keywords and all(len(kw) >= 3 for kw in query_keywords):
+        conditions = [{"$contains": kw} for kw in sorted(query_keywords)]
+        where_document = conditions[0] if len(conditions) == 1 else {"$or": conditions}
+        
+        try:
+            return await _chroma_call(collection.get, where_document=where_document, include=include)
+        except Exception as e:
+            logger.warning(f"Keyword filter not supported, scanning collection: {str(e)}")
+    
+    return await _chroma_call(collection.get, include=include)
+
 async def rerank_chunks(
     query: str,
     chunks: List[Dict[str, Any]],
-    max_chunks: int = 5
+    max_chunks: int = 5,
+    query_keywords: Optional[FrozenSet[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Re-rank chunks based on query relevance
@@ -203,6 +676,7 @@ async def rerank_chunks(
         query: User query
         chunks: List of chunks to re-rank
         max_chunks: Maximum number of chunks to return
+        query_keywords: Keywords of the query, computed if not given
         
     Returns:
         Re-ranked list of chunks
@@ -211,42 +685,73 @@ async def rerank_chunks(
         return []
     
     try:
-        # In a production system, this would use a trained reranker model
-        # For simplicity, we'll use a combination of:
-        # 1. Original similarity score
-        # 2. Keyword matching
-        # 3. Chunk length (prefer slightly longer chunks)
+        # Use the cross-encoder reranker when enabled
+        combined_scores = await cross_encoder_scores(query, [chunk["text"] for chunk in chunks])
         
-        query_keywords = set(query.lower().split())
+        if combined_scores is None:
+            if query_keywords is None:
+                query_keywords = query_keywords_of(query)
+            combined_scores = _heuristic_scores(query_keywords, chunks)
         
-        for chunk in chunks:
-            text = chunk["text"].lower()
-            
-            # Calculate keyword score
-            keyword_hits = sum(1 for kw in query_keywords if kw in text)
-            keyword_score = keyword_hits / len(query_keywords) if query_keywords else 0
-            
-            # Calculate length score (normalize between 0-1, prefer medium length)
-            text_length = len(text)
-            length_score = min(text_length / 1000, 1.0) if text_length < 1000 else (2000 - text_length) / 1000 if text_length < 2000 else 0
-            
-            # Combine scores (with weights)
-            original_score = chunk["similarity"]
-            combined_score = (original_score * 0.6) + (keyword_score * 0.3) + (length_score * 0.1)
-            
-            # Update chunk with new score
-            chunk["rerank_score"] = combined_score
+        # Take top chunks by combined score (highest first, ties keep order)
+        top = np.argsort(-combined_scores, kind="stable")[:max_chunks]
         
-        # Sort by combined score (highest first)
-        chunks.sort(key=lambda x: x.get("rerank_score", 0), reverse=True)
+        ranked_chunks = []
+        for i in top.tolist():
+            chunk = chunks[i]
+            chunk["rerank_score"] = float(combined_scores[i])
+            ranked_chunks.append(chunk)
         
-        # Take top chunks
-        return chunks[:max_chunks]
+        return ranked_chunks
         
     except Exception as e:
         logger.error(f"Error re-ranking chunks: {str(e)}")
         return chunks[:max_chunks]  # Fall back to original ordering
 
+def _heuristic_scores(query_keywords: FrozenSet[str], chunks: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Score chunks without a reranker model
+    
+    Uses a combination of:
+    1. Original similarity score
+    2. Keyword matching
+    3. Chunk length (prefer slightly longer chunks)
+    
+    Args:
+        query_keywords: Lowercased query keywords
+        chunks: Chunks to score
+        
+    Returns:
+        Combined score of each chunk
+    """
+    # Score all chunks at once over parallel arrays, reusing the
+    # lowercased text computed at retrieval time
+    texts = [chunk.get("_lower") or chunk["text"].lower() for chunk in chunks]
+    similarities = np.fromiter(
+        (chunk["similarity"] for chunk in chunks), dtype=np.float64, count=len(chunks)
+    )
+    
+    # Calculate keyword scores
+    keyword_scores = np.fromiter(
+        (sum(1 for kw in query_keywords if kw in text) for text in texts),
+        dtype=np.float64,
+        count=len(texts)
+    )
+    if query_keywords:
+        keyword_scores /= len(query_keywords)
+    
+    # Calculate length scores (normalize between 0-1, prefer medium length):
+    # rises to 1 at 1000 characters, falls back to 0 at 2000 and stays there
+    lengths = np.fromiter(map(len, texts), dtype=np.float64, count=len(texts))
+    length_scores = np.piecewise(
+        lengths,
+        [lengths < 1000, (lengths >= 1000) & (lengths < 2000)],
+        [lambda n: n / 1000, lambda n: (2000 - n) / 1000, 0.0]
+    )
+    
+    # Combine scores (with weights)
+    return (similarities * 0.6) + (keyword_scores * 0.3) + (length_scores * 0.1)
+
 async def preprocess_query(query: str) -> str:
     """
     Preprocess the query to improve retrieval
@@ -257,30 +762,10 @@ async def preprocess_query(query: str) -> str:
     Returns:
         Preprocessed query
     """
-    # Expand acronyms and abbreviations
-    expansions = {
-        "roi": "return on investment",
-        "pv": "photovoltaic",
-        "solar pv": "solar photovoltaic",
-        "kwh": "kilowatt hour",
-        "kw": "kilowatt",
-        "mw": "megawatt",
-        "ac": "alternating current",
-        "dc": "direct current"
-    }
-    
-    # Case-insensitive replacement
-    processed_query = query.lower()
-    
-    for abbr, expansion in expansions.items():
-        # Only replace whole words
-        processed_query = processed_query.replace(f" {abbr} ", f" {expansion} ")
-        # Check start of string
-        if processed_query.startswith(f"{abbr} "):
-            processed_query = f"{expansion} " + processed_query[len(abbr)+1:]
-        # Check end of string
-        if processed_query.endswith(f" {abbr}"):
-            processed_query = processed_query[:-len(abbr)-1] + f" {expansion}"
+    # Expand acronyms and abbreviations (case-insensitive, whole words only)
+    processed_query = _QUERY_EXPANSION_RE.sub(
+        lambda match: _QUERY_EXPANSIONS[match.group(0)], query.lower()
+    )
     
     # If the query is very short, try to expand it
     if len(processed_query.split()) <= 3:
@@ -357,19 +842,31 @@ async def optimize_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     
     # Remove duplicate content
     unique_chunks = []
-    seen_content = set()
+    seen_hashes: Set[int] = set()
     
     for chunk in chunks:
-        # Create a content signature (simplified for demonstration)
-        content = chunk["text"]
-        content_sig = " ".join(content.lower().split()[:50])
+        # Create a content signature (simplified for demonstration) from the
+        # first 50 lowercased words; maxsplit stops splitting after those
+        content_lower = chunk.get("_lower")
+        if content_lower is not None:
+            content_sig = " ".join(content_lower.split(None, 50)[:50])
+        else:
+            content_sig = " ".join(chunk["text"].split(None, 50)[:50]).lower()
+        
+        # Keep a 64-bit digest of the signature rather than the string itself
+        sig_hash = int.from_bytes(
+            hashlib.blake2b(content_sig.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little"
+        )
         
-        if content_sig not in seen_content:
-            seen_content.add(content_sig)
+        if sig_hash not in seen_hashes:
+            seen_hashes.add(sig_hash)
             unique_chunks.append(chunk)
     
     # Sort by original rank
-    unique_chunks.sort(key=lambda x: x.get("rank", float("inf")))
+    ranks = np.fromiter(
+        (chunk.get("rank", np.inf) for chunk in unique_chunks), dtype=np.float64, count=len(unique_chunks)
+    )
+    unique_chunks = [unique_chunks[i] for i in np.argsort(ranks, kind="stable").tolist()]
     
     # Merge very short, consecutive chunks from the same source
     merged_chunks = []
@@ -378,6 +875,8 @@ async def optimize_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     for chunk in unique_chunks:
         if current_chunk is None:
             current_chunk = chunk.copy()
+            # Merging changes the text, so the cached lowercase copy is dropped
+            current_chunk.pop("_lower", None)
         elif (
             len(current_chunk["text"]) < 300 
             and chunk.get("metadata", {}).get("source") == current_chunk.get("metadata", {}).get("source")
@@ -392,6 +891,7 @@ async def optimize_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         else:
             merged_chunks.append(current_chunk)
             current_chunk = chunk.copy()
+            current_chunk.pop("_lower", None)
     
     if current_chunk:
         merged_chunks.append(current_chunk)
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+try:
+    from fastembed.rerank.cross_encoder import TextCrossEncoder
+except ImportError:
+    TextCrossEncoder = None
+
+from backend.utils.logging import setup_logger
+from backend.config import settings
+
+logger = setup_logger("reranker")
+
+# Global cross-encoder instance, loaded on first use
+_model = None
+_model_failed = False
+_model_lock = threading.Lock()
+
+def get_reranker() -> Optional[Any]:
+    """
+    Get the cross-encoder reranker
+    
+    Returns:
+        Cross-encoder model, or None if reranking is disabled or unavailable
+    """
+    global _model, _model_failed
+    
+    if not settings.RERANKER_ENABLED or _model_failed:
+        return None
+    
+    if _model is not None:
+        return _model
+    
+    with _model_lock:
+        if _model is None and not _model_failed:
+            if TextCrossEncoder is None:
+                logger.warning("fastembed is not installed, using heuristic reranking")
+                _model_failed = True
+                return None
+            
+            try:
+                start_time = time.time()
+                _model = TextCrossEncoder(model_name=settings.RERANKER_MODEL_NAME)
+                logger.info(
+                    f"Loaded reranker {settings.RERANKER_MODEL_NAME} in {time.time() - start_time:.2f}s"
+                )
+            except Exception as e:
+                logger.error(f"Error loading reranker: {str(e)}")
+                _model_failed = True
+    
+    return _model
+
+def _score(model: Any, query: str, texts: List[str]) -> np.ndarray:
+    """Run the cross-encoder over all texts in one call"""
+    return np.fromiter(model.rerank(query, texts), dtype=np.float64, count=len(texts))
+
+async def cross_encoder_scores(query: str, texts: List[str]) -> Optional[np.ndarray]:
+    """
+    Score texts against a query with the cross-encoder
+    
+    Args:
+        query: User query
+        texts: Texts to score
+        
+    Returns:
+        Relevance scores (higher is better), or None if the reranker is unavailable
+    """
+    if not settings.RERANKER_ENABLED:
+        return None
+    
+    # Loading the model is slow, so the first call does it off the event loop
+    model = _model if _model is not None else await asyncio.to_thread(get_reranker)
+    if model is None:
+        return None
+    
+    try:
+        return await asyncio.to_thread(_score, model, query, texts)
+    except Exception as e:
+        logger.error(f"Error scoring with reranker: {str(e)}")
+        return None
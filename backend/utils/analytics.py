@@ -1,12 +1,18 @@
 import os
-import json
 import time
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Union, Tuple
+from datetime import date, datetime, timedelta
 import asyncio
 import threading
 from concurrent.futures import ThreadPoolExecutor
 import glob
+import functools
+import random
+from collections import deque
+
+import orjson
+from pymongo.errors import OperationFailure
+from pymongo.write_concern import WriteConcern
 
 from backend.db.mongodb import get_database
 from backend.utils.cache import get_cache, set_cache
@@ -15,6 +21,28 @@ from backend.config import settings
 
 logger = setup_logger("analytics")
 
+# Events fetched per cursor batch and bytes buffered per write when exporting
+EXPORT_BATCH_SIZE = 5000
+EXPORT_WRITE_BUFFER = 1 << 20
+
+_EPOCH = datetime(1970, 1, 1)
+
+_rand = random.random
+
+@functools.lru_cache(maxsize=64)
+def _day_keys(end_ordinal: int, days: int) -> Tuple[str, ...]:
+    """
+    Get the YYYY-MM-DD keys of the days ending at a date, most recent first
+    
+    Args:
+        end_ordinal: Proleptic Gregorian ordinal of the last day
+        days: Number of days
+        
+    Returns:
+        Day keys
+    """
+    return tuple(date.fromordinal(end_ordinal - i).isoformat() for i in range(days))
+
 class AnalyticsService:
     """
     Service for collecting and analyzing usage data
@@ -32,6 +60,10 @@ class AnalyticsService:
         self.collection = self.db["analytics"]
         self.events_collection = self.db["events"]
         self.performance_collection = self.db["performance"]
+        self.rollups_collection = self.db["daily_rollups"]
+        
+        # Create the raw data collections as time-series collections
+        self.timeseries_collections = self._ensure_timeseries_collections()
         
         # Ensure indices
         self._ensure_indices()
@@ -40,41 +72,203 @@ class AnalyticsService:
         self.data_dir = os.path.join(os.path.dirname(__file__), "..", "..", "data", "analytics")
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialize event buffer for batch processing
-        self.event_buffer = []
-        self.buffer_lock = threading.Lock()
+        # Initialize event buffer for batch processing; deque append and
+        # popleft are atomic, so producers never wait on each other or on
+        # a flush in progress. The buffers are bounded so a database outage
+        # drops the oldest records instead of growing memory without limit
+        self.max_buffered = settings.ANALYTICS_BUFFER_MAX_RECORDS
+        self.event_buffer: deque = deque(maxlen=self.max_buffered)
+        self.perf_buffer: deque = deque(maxlen=self.max_buffered)
         self.buffer_size = settings.ANALYTICS_BUFFER_SIZE
+        
+        # Records dropped from a full buffer since the last flush, by kind
+        self.dropped_records = {"events": 0, "performance metrics": 0}
         self.buffer_flush_interval = settings.ANALYTICS_FLUSH_INTERVAL
         
-        # Start buffer flush thread
+        # Tracking can be turned off, or sampled at high event rates
+        self.enabled = settings.ANALYTICS_ENABLED
+        self.sample_rate = settings.ANALYTICS_SAMPLE_RATE
+        
+        # Events are best-effort unless durability is requested: writes are
+        # unacknowledged and unordered
+        self.durable_events = settings.ANALYTICS_DURABLE
+        self.event_writer = self._writer(self.events_collection)
+        self.perf_writer = self._writer(self.performance_collection)
+        
+        # Writes the performance batch while the events batch is written, so
+        # a flush waits for one round trip instead of two
+        self._flush_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics-flush")
+        
+        # Start buffer flush thread; producers set the event to flush early
+        self._flush_requested = threading.Event()
         self._start_buffer_flush_thread()
+        
+        # Whether psutil has taken a CPU sample yet
+        self._cpu_sampled = False
+        
+        # Start daily rollup thread; the earliest day the rollups are known
+        # to cover is tracked so older ranges can be backfilled on demand
+        self.rollup_interval = settings.ANALYTICS_ROLLUP_INTERVAL
+        self.rollup_covered_from: Optional[date] = None
+        self._start_rollup_thread()
+    
+    def _writer(self, collection: Any) -> Any:
+        """Get the collection handle buffered records are written through"""
+        if self.durable_events:
+            return collection
+        return collection.with_options(write_concern=WriteConcern(w=0))
+    
+    def _ensure_timeseries_collections(self) -> set:
+        """
+        Create the events and performance collections as time-series collections
+        
+        Time-series collections store records in per-type, per-time buckets,
+        so range and group queries read far less data. Existing collections
+        are left as they are, since converting them means copying all data.
+        
+        Returns:
+            Names of the collections that are time-series collections
+        """
+        timeseries = set()
+        
+        try:
+            existing = {info["name"]: info for info in self.db.list_collections()}
+            
+            for collection, meta_field in [
+                (self.events_collection, "event_type"),
+                (self.performance_collection, "operation")
+            ]:
+                info = existing.get(collection.name)
+                
+                if info is None:
+                    options = {
+                        "timeseries": {
+                            "timeField": "timestamp",
+                            "metaField": meta_field,
+                            "granularity": "minutes"
+                        }
+                    }
+                    if settings.ANALYTICS_RETENTION_DAYS > 0:
+                        options["expireAfterSeconds"] = settings.ANALYTICS_RETENTION_DAYS * 86400
+                    
+                    try:
+                        self.db.create_collection(collection.name, **options)
+                        timeseries.add(collection.name)
+                    except OperationFailure as e:
+                        # Servers before MongoDB 5.0 have no time-series support
+                        logger.warning(f"Could not create time-series collection {collection.name}: {str(e)}")
+                        
+                elif info.get("type") == "timeseries":
+                    timeseries.add(collection.name)
+                    
+        except Exception as e:
+            logger.error(f"Error ensuring time-series collections: {str(e)}")
+        
+        return timeseries
     
     def _ensure_indices(self) -> None:
         """Ensure database indices exist"""
+        # Event and performance queries filter on a type, operation or user
+        # and a time range, so the compound indices serve them with one range
+        # scan. The timestamp index serves type-less exports and retention
+        indices = [
+            (self.collection, "timestamp"),
+            (self.collection, "type"),
+            (self.collection, "user_id"),
+            (self.events_collection, [("event_type", 1), ("timestamp", 1)]),
+            (self.performance_collection, [("operation", 1), ("timestamp", 1)]),
+            (self.rollups_collection, "day")
+        ]
+        
+        # MongoDB 5.0 only allows time-series indices on the meta and time
+        # fields; user_id is a measurement field
+        if (
+            self.events_collection.name not in self.timeseries_collections
+            or self._server_version() >= (6, 0)
+        ):
+            indices.append((self.events_collection, [("user_id", 1), ("timestamp", -1)]))
+        
+        # Each index is ensured on its own, so one rejected index doesn't
+        # skip the rest
+        for collection in (self.events_collection, self.performance_collection):
+            try:
+                self._ensure_timestamp_index(collection)
+            except Exception as e:
+                logger.error(f"Error ensuring timestamp index on {collection.name}: {str(e)}")
+        
+        for collection, keys in indices:
+            try:
+                collection.create_index(keys)
+            except Exception as e:
+                logger.error(f"Error ensuring index {keys} on {collection.name}: {str(e)}")
+        
+        # Single-field indices now covered by a compound index prefix
+        for collection, index_name in [
+            (self.events_collection, "event_type_1"),
+            (self.events_collection, "user_id_1"),
+            (self.performance_collection, "operation_1")
+        ]:
+            try:
+                if index_name in collection.index_information():
+                    collection.drop_index(index_name)
+            except Exception as e:
+                logger.error(f"Error dropping index {index_name} on {collection.name}: {str(e)}")
+    
+    def _server_version(self) -> Tuple[int, ...]:
+        """Get the MongoDB server version, or (0,) if it can't be read"""
         try:
-            # Analytics collection indices
-            self.collection.create_index("timestamp")
-            self.collection.create_index("type")
-            self.collection.create_index("user_id")
-            
-            # Events collection indices
-            self.events_collection.create_index("timestamp")
-            self.events_collection.create_index("event_type")
-            self.events_collection.create_index("user_id")
-            
-            # Performance collection indices
-            self.performance_collection.create_index("timestamp")
-            self.performance_collection.create_index("operation")
-            
+            return tuple(self.db.client.server_info()["versionArray"][:2])
         except Exception as e:
-            logger.error(f"Error ensuring indices: {str(e)}")
+            logger.warning(f"Could not read MongoDB server version: {str(e)}")
+            return (0,)
+    
+    def _ensure_timestamp_index(self, collection: Any) -> None:
+        """
+        Ensure the timestamp index exists, expiring old records if retention is set
+        
+        Args:
+            collection: Collection to index
+        """
+        retention_days = settings.ANALYTICS_RETENTION_DAYS
+        expire_after = retention_days * 86400
+        
+        if collection.name in self.timeseries_collections:
+            # Time-series collections expire whole buckets instead of using
+            # a TTL index
+            collection.create_index("timestamp")
+            if retention_days > 0:
+                self.db.command("collMod", collection.name, expireAfterSeconds=expire_after)
+            return
+        
+        if retention_days <= 0:
+            try:
+                collection.create_index("timestamp")
+            except OperationFailure:
+                # A timestamp index with a TTL already exists; retention is
+                # opt-in, so an existing TTL is left as configured
+                pass
+            return
+        
+        try:
+            collection.create_index("timestamp", expireAfterSeconds=expire_after)
+        except OperationFailure:
+            # An index on timestamp already exists with other options
+            try:
+                self.db.command(
+                    "collMod",
+                    collection.name,
+                    index={"keyPattern": {"timestamp": 1}, "expireAfterSeconds": expire_after}
+                )
+            except OperationFailure as e:
+                logger.warning(f"Could not set retention on {collection.name}: {str(e)}")
     
     def _start_buffer_flush_thread(self) -> None:
-        """Start a thread to periodically flush the event buffer"""
+        """Start a thread to flush the buffers periodically or when full"""
         def flush_thread():
             while True:
                 try:
-                    time.sleep(self.buffer_flush_interval)
+                    self._flush_requested.wait(self.buffer_flush_interval)
+                    self._flush_requested.clear()
                     self.flush_event_buffer()
                 except Exception as e:
                     logger.error(f"Error in buffer flush thread: {str(e)}")
@@ -82,6 +276,82 @@ class AnalyticsService:
         thread = threading.Thread(target=flush_thread, daemon=True)
         thread.start()
     
+    def _start_rollup_thread(self) -> None:
+        """Start a thread to periodically refresh the daily rollups"""
+        def rollup_thread():
+            # Backfill once, then only refresh the days still receiving events
+            # plus any missed while rollups were failing
+            last_success = None
+            while True:
+                try:
+                    today = datetime.utcnow().date()
+                    if last_success is None:
+                        days = settings.ANALYTICS_ROLLUP_BACKFILL_DAYS
+                    else:
+                        days = (today - last_success).days + 2
+                    self.rollup_daily_stats(days)
+                    last_success = today
+                except Exception as e:
+                    logger.error(f"Error in rollup thread: {str(e)}")
+                time.sleep(self.rollup_interval)
+        
+        thread = threading.Thread(target=rollup_thread, daemon=True)
+        thread.start()
+    
+    def rollup_daily_stats(self, days: int = 2) -> None:
+        """
+        Recompute the daily event counts of recent days into daily_rollups
+        
+        Each rollup document holds the event count and distinct user count
+        of one event type on one day.
+        
+        Args:
+            days: Number of days to recompute, including today
+        """
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = today - timedelta(days=days - 1)
+        
+        pipeline = [
+            {"$match": {
+                "event_type": {"$in": ["query", "error", "document_view"]},
+                "timestamp": {"$gte": start_date}
+            }},
+            # Distinct users are only reported for queries, so other
+            # events are not split by user
+            {"$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "type": "$event_type",
+                    "user": {"$cond": [{"$eq": ["$event_type", "query"]}, "$user_id", None]}
+                },
+                "count": {"$sum": 1}
+            }},
+            # Count the users server-side instead of returning their ids
+            {"$group": {
+                "_id": {"day": "$_id.day", "type": "$_id.type"},
+                "count": {"$sum": "$count"},
+                "users": {"$sum": {
+                    "$cond": [{"$ne": [{"$ifNull": ["$_id.user", ""]}, ""]}, 1, 0]
+                }}
+            }},
+            {"$project": {
+                "_id": {"$concat": ["$_id.day", ":", "$_id.type"]},
+                "day": "$_id.day",
+                "event_type": "$_id.type",
+                "count": 1,
+                "unique_users": "$users"
+            }},
+            {"$merge": {"into": self.rollups_collection.name, "whenMatched": "replace"}}
+        ]
+        
+        start_time = time.time()
+        self.events_collection.aggregate(pipeline)
+        logger.info(f"Rolled up {days} days of events in {time.time() - start_time:.2f}s")
+        
+        covered_from = start_date.date()
+        if self.rollup_covered_from is None or covered_from < self.rollup_covered_from:
+            self.rollup_covered_from = covered_from
+    
     def track_event(
         self,
         event_type: str,
@@ -96,37 +366,89 @@ class AnalyticsService:
             data: Event data
             user_id: Optional user ID
         """
+        if not self.enabled:
+            return
+        
+        if self.sample_rate < 1.0 and _rand() >= self.sample_rate:
+            return
+        
         event = {
             "event_type": event_type,
             "user_id": user_id,
             "data": data,
-            "timestamp": datetime.utcnow()
+            "timestamp": time.time_ns()
         }
         
-        # Add to buffer for batch processing
-        with self.buffer_lock:
-            self.event_buffer.append(event)
-            
-            # Flush buffer if it reaches the size threshold
-            if len(self.event_buffer) >= self.buffer_size:
-                self.flush_event_buffer()
+        # Add to buffer for batch processing; a full buffer drops its oldest
+        if len(self.event_buffer) >= self.max_buffered:
+            self.dropped_records["events"] += 1
+        self.event_buffer.append(event)
+        
+        # Have the flush thread flush once the size threshold is reached
+        if len(self.event_buffer) >= self.buffer_size:
+            self._flush_requested.set()
     
     def flush_event_buffer(self) -> None:
-        """Flush the event buffer to the database"""
-        with self.buffer_lock:
-            if not self.event_buffer:
-                return
+        """Flush the event and performance buffers to the database"""
+        if not self.perf_buffer:
+            self._flush_buffer(self.event_buffer, self.event_writer, "events")
+            return
+        
+        perf_flush = self._flush_pool.submit(
+            self._flush_buffer, self.perf_buffer, self.perf_writer, "performance metrics"
+        )
+        self._flush_buffer(self.event_buffer, self.event_writer, "events")
+        perf_flush.result()
+    
+    def _flush_buffer(self, buffer: deque, writer: Any, label: str) -> None:
+        """
+        Write the records buffered so far in one batch
+        
+        Args:
+            buffer: Buffer to drain
+            writer: Collection handle to insert through
+            label: Record kind, for logging
+        """
+        # Take the records buffered so far; concurrent flushes each get
+        # distinct ones
+        records = []
+        try:
+            for _ in range(len(buffer)):
+                records.append(buffer.popleft())
+        except IndexError:
+            pass
+        
+        dropped = self.dropped_records[label]
+        if dropped:
+            self.dropped_records[label] = 0
+            logger.warning(f"Dropped {dropped} {label} from a full buffer")
+        
+        if not records:
+            return
+        
+        # Records are stamped with time.time_ns() when tracked, which is
+        # cheaper than building a datetime per record; convert them to naive
+        # UTC datetimes here, once per batch; requeued records are already
+        # converted
+        for record in records:
+            timestamp = record["timestamp"]
+            if isinstance(timestamp, int):
+                record["timestamp"] = _EPOCH + timedelta(microseconds=timestamp // 1000)
+        
+        try:
+            # Insert records in batch
+            writer.insert_many(records, ordered=False)
+            logger.info(f"Flushed {len(records)} {label} to database")
             
-            try:
-                # Insert events in batch
-                self.events_collection.insert_many(self.event_buffer)
-                logger.info(f"Flushed {len(self.event_buffer)} events to database")
-                
-                # Clear buffer
-                self.event_buffer = []
-                
-            except Exception as e:
-                logger.error(f"Error flushing event buffer: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error flushing {label} buffer: {str(e)}")
+            # Put back the newest records that still fit for the next flush;
+            # extendleft on a full deque would drop the newest buffered ones
+            room = self.max_buffered - len(buffer)
+            requeued = records[-room:] if room > 0 else []
+            if len(requeued) < len(records):
+                logger.warning(f"Dropped {len(records) - len(requeued)} {label} after a failed flush")
+            buffer.extendleft(reversed(requeued))
     
     def track_query(
         self,
@@ -212,18 +534,24 @@ class AnalyticsService:
             duration: Duration in seconds
             metadata: Optional metadata
         """
+        if not self.enabled:
+            return
+        
         metadata = metadata or {}
         
-        # Log directly to performance collection
-        try:
-            self.performance_collection.insert_one({
-                "operation": operation,
-                "duration": duration,
-                "metadata": metadata,
-                "timestamp": datetime.utcnow()
-            })
-        except Exception as e:
-            logger.error(f"Error tracking performance: {str(e)}")
+        # Add to buffer for batch processing; a full buffer drops its oldest
+        if len(self.perf_buffer) >= self.max_buffered:
+            self.dropped_records["performance metrics"] += 1
+        self.perf_buffer.append({
+            "operation": operation,
+            "duration": duration,
+            "metadata": metadata,
+            "timestamp": time.time_ns()
+        })
+        
+        # Have the flush thread flush once the size threshold is reached
+        if len(self.perf_buffer) >= self.buffer_size:
+            self._flush_requested.set()
     
     async def get_daily_stats(
         self,
@@ -252,72 +580,38 @@ class AnalyticsService:
         try:
             # Calculate date range
             end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=days)
-            
-            # Aggregate query stats by day
-            query_pipeline = [
-                {"$match": {"event_type": "query", "timestamp": {"$gte": start_date, "$lte": end_date}}},
-                {"$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                    "count": {"$sum": 1},
-                    "users": {"$addToSet": "$user_id"}
-                }},
-                {"$sort": {"_id": 1}}
-            ]
-            
-            query_results = list(self.events_collection.aggregate(query_pipeline))
-            
-            # Aggregate error stats by day
-            error_pipeline = [
-                {"$match": {"event_type": "error", "timestamp": {"$gte": start_date, "$lte": end_date}}},
-                {"$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"_id": 1}}
-            ]
-            
-            error_results = list(self.events_collection.aggregate(error_pipeline))
-            
-            # Aggregate document view stats by day
-            doc_view_pipeline = [
-                {"$match": {"event_type": "document_view", "timestamp": {"$gte": start_date, "$lte": end_date}}},
-                {"$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"_id": 1}}
-            ]
+            days_list = list(_day_keys(end_date.toordinal(), days))
             
-            doc_view_results = list(self.events_collection.aggregate(doc_view_pipeline))
+            # Days without events have no rollup document, so days the
+            # rollups don't cover yet are rolled up first instead of being
+            # reported as zero
+            start_day = end_date.date() - timedelta(days=days - 1)
+            if self.rollup_covered_from is None or start_day < self.rollup_covered_from:
+                await asyncio.to_thread(self.rollup_daily_stats, days)
             
-            # Format results
-            days_list = [(end_date - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+            # Read the per-day counts from the rollups
+            results = self.rollups_collection.find({"day": {"$in": days_list}})
             
             # Initialize results with zeros
-            queries_by_day = {day: 0 for day in days_list}
-            errors_by_day = {day: 0 for day in days_list}
-            doc_views_by_day = {day: 0 for day in days_list}
-            users_by_day = {day: 0 for day in days_list}
-            
-            # Fill in query data
-            for day_data in query_results:
-                day = day_data["_id"]
-                if day in queries_by_day:
-                    queries_by_day[day] = day_data["count"]
-                    users_by_day[day] = len([u for u in day_data["users"] if u])
-            
-            # Fill in error data
-            for day_data in error_results:
-                day = day_data["_id"]
-                if day in errors_by_day:
-                    errors_by_day[day] = day_data["count"]
-            
-            # Fill in document view data
-            for day_data in doc_view_results:
-                day = day_data["_id"]
-                if day in doc_views_by_day:
-                    doc_views_by_day[day] = day_data["count"]
+            queries_by_day = dict.fromkeys(days_list, 0)
+            errors_by_day = dict.fromkeys(days_list, 0)
+            doc_views_by_day = dict.fromkeys(days_list, 0)
+            users_by_day = dict.fromkeys(days_list, 0)
+            
+            counts_by_type = {
+                "query": queries_by_day,
+                "error": errors_by_day,
+                "document_view": doc_views_by_day
+            }
+            
+            # Fill in data
+            for day_data in results:
+                day = day_data["day"]
+                event_type = day_data["event_type"]
+                
+                counts_by_type[event_type][day] = day_data["count"]
+                if event_type == "query":
+                    users_by_day[day] = day_data["unique_users"]
             
             # Prepare final results
             result = {
@@ -331,7 +625,8 @@ class AnalyticsService:
             # Cache results
             if use_cache:
                 cache_key = f"analytics:daily_stats:{days}"
-                set_cache(cache_key, result, expiry=3600)  # 1 hour
+                # Rollups only change once per rollup interval
+                set_cache(cache_key, result, expiry=self.rollup_interval)
             
             return result
             
@@ -390,9 +685,15 @@ class AnalyticsService:
             
             operation_results = list(self.performance_collection.aggregate(pipeline))
             
-            # Aggregate daily average performance
+            # Top operations; the pipeline already sorts by count
+            top_operations = [op["_id"] for op in operation_results[:5]]
+            
+            # Aggregate daily average performance of the top operations only
             daily_pipeline = [
-                {"$match": {"timestamp": {"$gte": start_date, "$lte": end_date}}},
+                {"$match": {
+                    "operation": {"$in": top_operations},
+                    "timestamp": {"$gte": start_date, "$lte": end_date}
+                }},
                 {"$group": {
                     "_id": {
                         "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
@@ -413,21 +714,18 @@ class AnalyticsService:
                 "min_duration": op["min_duration"]
             } for op in operation_results}
             
-            # Get top operations
-            top_operations = sorted(operations.keys(), key=lambda x: operations[x]["count"], reverse=True)[:5]
-            
             # Format daily results
-            days_list = [(end_date - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+            days_list = list(_day_keys(end_date.toordinal(), days))
             
             # Initialize daily data
-            daily_data = {op: {day: 0 for day in days_list} for op in top_operations}
+            daily_data = {op: dict.fromkeys(days_list, 0) for op in top_operations}
             
             # Fill in daily data
             for day_data in daily_results:
                 day = day_data["_id"]["date"]
                 operation = day_data["_id"]["operation"]
                 
-                if operation in top_operations and day in days_list:
+                if day in daily_data[operation]:
                     daily_data[operation][day] = day_data["avg_duration"]
             
             # Prepare final results
@@ -609,11 +907,21 @@ class AnalyticsService:
         Returns:
             Dictionary with system health metrics
         """
+        # Serve repeated health checks from a short-lived snapshot
+        cached_health = get_cache("analytics:system_health")
+        if cached_health:
+            return cached_health
+        
         try:
             import psutil
             
-            # Get CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Get CPU usage; the first call samples for a second off the event
+            # loop, later ones return the average since the previous call
+            if self._cpu_sampled:
+                cpu_percent = psutil.cpu_percent(interval=None)
+            else:
+                cpu_percent = await asyncio.to_thread(psutil.cpu_percent, 1)
+                self._cpu_sampled = True
             
             # Get memory usage
             memory = psutil.virtual_memory()
@@ -623,20 +931,17 @@ class AnalyticsService:
             disk = psutil.disk_usage('/')
             disk_percent = disk.percent
             
-            # Get log file sizes
-            log_files = glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "logs", "*.log"))
-            log_sizes = {os.path.basename(f): os.path.getsize(f) / (1024 * 1024) for f in log_files}  # Size in MB
+            # Get log file sizes (rescanned at most every 30 seconds)
+            log_sizes = get_cache("analytics:log_sizes")
+            if log_sizes is None:
+                log_files = glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "logs", "*.log"))
+                log_sizes = {os.path.basename(f): os.path.getsize(f) / (1024 * 1024) for f in log_files}  # Size in MB
+                set_cache("analytics:log_sizes", log_sizes, expiry=30)
             
-            # Check recent errors
+            # Check recent errors and response time metrics concurrently
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(hours=1)
             
-            recent_errors = self.events_collection.count_documents({
-                "event_type": "error",
-                "timestamp": {"$gte": start_date, "$lte": end_date}
-            })
-            
-            # Get response time metrics
             response_time_pipeline = [
                 {"$match": {
                     "operation": "generate_response",
@@ -650,7 +955,15 @@ class AnalyticsService:
                 }}
             ]
             
-            response_time_results = list(self.performance_collection.aggregate(response_time_pipeline))
+            recent_errors, response_time_results = await asyncio.gather(
+                asyncio.to_thread(
+                    self.events_collection.count_documents,
+                    {"event_type": "error", "timestamp": {"$gte": start_date, "$lte": end_date}}
+                ),
+                asyncio.to_thread(
+                    lambda: list(self.performance_collection.aggregate(response_time_pipeline))
+                )
+            )
             
             response_times = response_time_results[0] if response_time_results else {
                 "avg_duration": 0,
@@ -666,7 +979,7 @@ class AnalyticsService:
             elif cpu_percent > 75 or memory_percent > 75 or disk_percent > 75 or recent_errors > 10:
                 health_status = "warning"
             
-            return {
+            health = {
                 "status": health_status,
                 "cpu_percent": cpu_percent,
                 "memory_percent": memory_percent,
@@ -681,6 +994,10 @@ class AnalyticsService:
                 "timestamp": datetime.utcnow().isoformat()
             }
             
+            set_cache("analytics:system_health", health, expiry=5)
+            
+            return health
+            
         except Exception as e:
             logger.error(f"Error getting system health: {str(e)}")
             return {
@@ -713,26 +1030,40 @@ class AnalyticsService:
             if event_types:
                 query["event_type"] = {"$in": event_types}
             
-            # Get events
-            events = list(self.events_collection.find(query, {"_id": 0}))
-            
-            # Convert datetime objects to strings
-            for event in events:
-                event["timestamp"] = event["timestamp"].isoformat()
-            
             # Create export file
             file_name = f"analytics_export_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.json"
             file_path = os.path.join(self.data_dir, file_name)
             
-            # Write to file
-            with open(file_path, 'w') as f:
-                json.dump(events, f, indent=2)
+            # Reading and encoding every event takes a while, so keep it off
+            # the event loop
+            await asyncio.to_thread(self._export_sync, query, file_path)
             
             return file_path
             
         except Exception as e:
             logger.error(f"Error exporting analytics: {str(e)}")
             raise
+    
+    def _export_sync(self, query: Dict[str, Any], file_path: str) -> None:
+        """
+        Write the events matching a query to a file as a JSON array
+        
+        Args:
+            query: Events query
+            file_path: Path to the export file
+        """
+        # Stream events from the cursor a batch at a time
+        events = self.events_collection.find(query, {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+        
+        # Write a JSON array one event at a time; orjson writes datetimes
+        # in ISO format
+        with open(file_path, 'wb', buffering=EXPORT_WRITE_BUFFER) as f:
+            f.write(b"[")
+            for i, event in enumerate(events):
+                if i:
+                    f.write(b",\n")
+                f.write(orjson.dumps(event, default=str))
+            f.write(b"]")
 
 # Create singleton instance
 analytics_service = AnalyticsService()
\ No newline at end of file
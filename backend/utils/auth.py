@@ -1,8 +1,11 @@
 import os
 import time
+import asyncio
 import re
 import hashlib
 import secrets
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime, timedelta
 
@@ -21,6 +24,14 @@ logger = setup_logger("auth")
 # Password context for hashing and verification
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Successful password checks, remembered briefly so repeated logins skip
+# bcrypt; keyed by a digest with a per-process key, so entries are useless
+# outside this process
+VERIFY_CACHE_SIZE = 4096
+_verify_cache_key = secrets.token_bytes(32)
+_verify_cache: "OrderedDict[bytes, float]" = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
 class AuthService:
     """
     Authentication service with features:
@@ -92,7 +103,36 @@ class AuthService:
         Returns:
             True if password matches hash, False otherwise
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        ttl = settings.PASSWORD_VERIFY_CACHE_TTL
+        if ttl <= 0:
+            return pwd_context.verify(plain_password, hashed_password)
+        
+        # The stored hash is part of the key, so a password change
+        # invalidates the entry
+        key = hashlib.blake2b(
+            plain_password.encode() + b"\0" + hashed_password.encode(),
+            digest_size=16,
+            key=_verify_cache_key
+        ).digest()
+        now = time.monotonic()
+        
+        with _verify_cache_lock:
+            expires = _verify_cache.get(key)
+            if expires is not None:
+                if expires > now:
+                    return True
+                del _verify_cache[key]
+        
+        # Failures are never cached, so guessing always pays for bcrypt
+        if not pwd_context.verify(plain_password, hashed_password):
+            return False
+        
+        with _verify_cache_lock:
+            _verify_cache[key] = now + ttl
+            if len(_verify_cache) > VERIFY_CACHE_SIZE:
+                _verify_cache.popitem(last=False)
+        
+        return True
     
     def validate_password_strength(self, password: str) -> Tuple[bool, str]:
         """
@@ -126,7 +166,7 @@ class AuthService:
         
         return True, ""
     
-    def register_user(
+    async def register_user(
         self,
         email: str,
         username: str,
@@ -150,6 +190,19 @@ class AuthService:
         Raises:
             HTTPException: If registration fails
         """
+        return await asyncio.to_thread(
+            self._register_user_sync, email, username, password, full_name, role
+        )
+    
+    def _register_user_sync(
+        self,
+        email: str,
+        username: str,
+        password: str,
+        full_name: Optional[str] = None,
+        role: str = "user"
+    ) -> Dict[str, Any]:
+        """Blocking implementation of register_user"""
         try:
             # Normalize email and username
             email = email.lower().strip()
@@ -227,7 +280,7 @@ class AuthService:
                 detail="Error registering user"
             )
     
-    def authenticate_user(
+    async def authenticate_user(
         self,
         email_or_username: str,
         password: str,
@@ -247,6 +300,17 @@ class AuthService:
         Raises:
             HTTPException: If authentication fails
         """
+        return await asyncio.to_thread(
+            self._authenticate_user_sync, email_or_username, password, ip_address
+        )
+    
+    def _authenticate_user_sync(
+        self,
+        email_or_username: str,
+        password: str,
+        ip_address: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Blocking implementation of authenticate_user"""
         try:
             # Normalize input
             email_or_username = email_or_username.lower().strip()
@@ -384,7 +448,7 @@ class AuthService:
         except Exception as e:
             logger.error(f"Error recording login attempt: {str(e)}")
     
-    def create_password_reset_token(self, email: str) -> str:
+    async def create_password_reset_token(self, email: str) -> str:
         """
         Create a password reset token
         
@@ -397,6 +461,10 @@ class AuthService:
         Raises:
             HTTPException: If user not found
         """
+        return await asyncio.to_thread(self._create_password_reset_token_sync, email)
+    
+    def _create_password_reset_token_sync(self, email: str) -> str:
+        """Blocking implementation of create_password_reset_token"""
         try:
             # Normalize email
             email = email.lower().strip()
@@ -452,7 +520,7 @@ class AuthService:
                 detail="Error creating password reset token"
             )
     
-    def reset_password(self, token: str, new_password: str) -> bool:
+    async def reset_password(self, token: str, new_password: str) -> bool:
         """
         Reset a user's password using a reset token
         
@@ -466,6 +534,10 @@ class AuthService:
         Raises:
             HTTPException: If token is invalid or expired
         """
+        return await asyncio.to_thread(self._reset_password_sync, token, new_password)
+    
+    def _reset_password_sync(self, token: str, new_password: str) -> bool:
+        """Blocking implementation of reset_password"""
         try:
             # Decode token
             try:
@@ -545,7 +617,7 @@ class AuthService:
                 detail="Error resetting password"
             )
     
-    def change_password(
+    async def change_password(
         self,
         user_id: str,
         current_password: str,
@@ -565,6 +637,17 @@ class AuthService:
         Raises:
             HTTPException: If current password is incorrect
         """
+        return await asyncio.to_thread(
+            self._change_password_sync, user_id, current_password, new_password
+        )
+    
+    def _change_password_sync(
+        self,
+        user_id: str,
+        current_password: str,
+        new_password: str
+    ) -> bool:
+        """Blocking implementation of change_password"""
         try:
             # Find user
             user = self.user_collection.find_one({"_id": user_id})
@@ -611,7 +694,7 @@ class AuthService:
                 detail="Error changing password"
             )
     
-    def update_user_profile(
+    async def update_user_profile(
         self,
         user_id: str,
         data: Dict[str, Any]
@@ -629,6 +712,14 @@ class AuthService:
         Raises:
             HTTPException: If update fails
         """
+        return await asyncio.to_thread(self._update_user_profile_sync, user_id, data)
+    
+    def _update_user_profile_sync(
+        self,
+        user_id: str,
+        data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Blocking implementation of update_user_profile"""
         try:
             # Create update data
             update_data = {}
@@ -706,7 +797,7 @@ class AuthService:
                 detail="Error updating user profile"
             )
     
-    def deactivate_user(self, user_id: str) -> bool:
+    async def deactivate_user(self, user_id: str) -> bool:
         """
         Deactivate a user account
         
@@ -716,6 +807,10 @@ class AuthService:
         Returns:
             True if user was deactivated, False otherwise
         """
+        return await asyncio.to_thread(self._deactivate_user_sync, user_id)
+    
+    def _deactivate_user_sync(self, user_id: str) -> bool:
+        """Blocking implementation of deactivate_user"""
         try:
             # Update user
             result = self.user_collection.update_one(
@@ -732,7 +827,7 @@ class AuthService:
             logger.error(f"Error deactivating user: {str(e)}")
             return False
     
-    def reactivate_user(self, user_id: str) -> bool:
+    async def reactivate_user(self, user_id: str) -> bool:
         """
         Reactivate a user account
         
@@ -742,6 +837,10 @@ class AuthService:
         Returns:
             True if user was reactivated, False otherwise
         """
+        return await asyncio.to_thread(self._reactivate_user_sync, user_id)
+    
+    def _reactivate_user_sync(self, user_id: str) -> bool:
+        """Blocking implementation of reactivate_user"""
         try:
             # Update user
             result = self.user_collection.update_one(
@@ -0,0 +1,55 @@
+"""
+Compact serialization for cached values.
+
+Values are packed with msgpack and compressed with zstd, so large cached
+payloads (e.g. retrieved chunk lists) take a fraction of the memory of the
+original Python objects.
+"""
+
+import threading
+from typing import Any
+
+import msgpack
+import zstandard
+
+# zstd compression level (3 is the library default speed/ratio trade-off)
+COMPRESSION_LEVEL = 3
+
+# zstd contexts are not safe to share between threads
+_local = threading.local()
+
+def _compressor() -> zstandard.ZstdCompressor:
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return compressor
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+def encode(obj: Any) -> bytes:
+    """
+    Serialize and compress a value
+
+    Args:
+        obj: Value made of dicts, lists, strings, numbers, booleans and None
+
+    Returns:
+        Compressed bytes
+    """
+    return _compressor().compress(msgpack.packb(obj, use_bin_type=True))
+
+def decode(data: bytes) -> Any:
+    """
+    Decompress and deserialize a value produced by encode()
+
+    Args:
+        data: Compressed bytes
+
+    Returns:
+        Original value
+    """
+    return msgpack.unpackb(_decompressor().decompress(data), raw=False)